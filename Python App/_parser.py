@@ -0,0 +1,115 @@
+"""
+Pure-string parsing helpers for the weather agent client.
+
+Everything in this module takes plain ``str`` input and returns plain
+``dict``/``str`` output — no SDK objects leak in. Keeping the hot text
+parsing free of interpreter-heavy dependencies makes it independently
+testable and suitable for ahead-of-time compilation, e.g.:
+
+    python -m mypyc _parser.py
+
+The fully annotated signatures below are what mypyc needs to specialize
+the string and dict operations.
+"""
+
+import json
+from typing import Dict, Optional, Tuple
+
+import re
+
+
+_JSON_DECODER = json.JSONDecoder()
+
+# Precompiled patterns, compiled once at import instead of per parsed line
+_TEMP_RE = re.compile(r'(\d+(?:\.\d+)?)\s*°?[cf]?')
+_HUMIDITY_RE = re.compile(r'(\d+(?:\.\d+)?)\s*%?')
+_CONDITIONS: Tuple[Tuple[str, str], ...] = (
+    ('sunny', 'Sunny'),
+    ('cloudy', 'Cloudy'),
+    ('rainy', 'Rainy'),
+    ('rain', 'Rainy'),
+    ('clear', 'Clear'),
+)
+
+_REQUIRED_KEYS: Tuple[str, ...] = ("city", "temperature", "condition", "humidity")
+
+
+def extract_weather_json(response_content: str) -> Optional[Dict[str, str]]:
+    """
+    Extract an embedded weather JSON object from a response, if present.
+
+    Parses directly from the first opening brace in a single pass via
+    raw_decode. Returns a dict with all required keys coerced to str, or
+    None when no complete weather object is embedded in the text.
+
+    Args:
+        response_content: The assistant's raw response text
+
+    Returns:
+        Dict with city/temperature/condition/humidity keys, or None
+    """
+    start: int = response_content.find("{")
+    if start < 0:
+        return None
+
+    try:
+        weather_data, _ = _JSON_DECODER.raw_decode(response_content, start)
+    except json.JSONDecodeError:
+        return None
+
+    if not isinstance(weather_data, dict):
+        return None
+    for key in _REQUIRED_KEYS:
+        if key not in weather_data:
+            return None
+
+    return {key: str(weather_data[key]) for key in _REQUIRED_KEYS}
+
+
+def parse_weather_text(response_content: str, requested_city: str) -> Dict[str, str]:
+    """
+    Parse weather fields out of free-text assistant output.
+
+    This is a simple line-oriented parser — in a real implementation you
+    might want more sophisticated NLP. Fields that cannot be extracted
+    fall back to "Unknown".
+
+    Args:
+        response_content: The assistant's raw response text
+        requested_city: The originally requested city
+
+    Returns:
+        Dict with city/temperature/condition/humidity keys
+    """
+    city: str = requested_city
+    temperature: str = "Unknown"
+    condition: str = "Unknown"
+    humidity: str = "Unknown"
+
+    for line in response_content.strip().split('\n'):
+        line = line.strip().lower()
+        if 'temperature' in line or 'temp' in line:
+            # Extract temperature
+            temp_match = _TEMP_RE.search(line)
+            if temp_match:
+                temperature = f"{temp_match.group(1)}°C"
+
+        elif 'condition' in line or 'weather' in line:
+            # Extract condition
+            for keyword, label in _CONDITIONS:
+                if keyword in line:
+                    condition = label
+                    break
+
+        elif 'humidity' in line:
+            # Extract humidity
+            humidity_match = _HUMIDITY_RE.search(line)
+            if humidity_match:
+                humidity = f"{humidity_match.group(1)}%"
+
+    return {
+        "city": city,
+        "temperature": temperature,
+        "condition": condition,
+        "humidity": humidity,
+    }
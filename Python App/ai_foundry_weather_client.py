@@ -1,473 +1,1226 @@
-"""
-Azure AI Foundry Weather Agent Client
-
-This module provides a client interface to interact with the weather agent
-using Azure AI Foundry SDK with best practices including:
-- Azure Identity for secure authentication (DefaultAzureCredential)
-- Azure AI Foundry project endpoint
-- Proper error handling and retry logic
-- Structured logging and monitoring
-- Resource cleanup and connection management
-
-Best Practices Implemented:
-- Use DefaultAzureCredential for authentication (supports Managed Identity, Service Principal, etc.)
-- Never hardcode credentials
-- Implement retry logic with exponential backoff
-- Comprehensive error handling and logging
-- Proper resource cleanup
-- Input validation using Pydantic models
-"""
-
-import json
-import logging
-import time
-from typing import Optional, Dict, Any, List
-from dataclasses import dataclass
-
-from azure.ai.projects import AIProjectClient
-from azure.identity import DefaultAzureCredential
-from azure.core.exceptions import AzureError
-from pydantic import BaseModel, Field, field_validator
-
-
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-)
-logger = logging.getLogger(__name__)
-
-
-class WeatherRequest(BaseModel):
-    """Pydantic model for weather request validation."""
-    
-    city: str = Field(..., min_length=1, description="City name to get weather for")
-    
-    @field_validator('city')
-    def validate_city(cls, v):
-        """Validate city name format."""
-        if not v.strip():
-            raise ValueError("City name cannot be empty")
-        return v.strip()
-
-
-class WeatherResult(BaseModel):
-    """Pydantic model for weather response."""
-    
-    city: str
-    temperature: str
-    condition: str
-    humidity: str
-
-
-@dataclass
-class AIFoundryConfig:
-    """Configuration for the Azure AI Foundry Weather Agent Client."""
-    
-    endpoint: str
-    assistant_id: str = "asst_14scpW964zK5TSFzjpdek9jG"
-    timeout: int = 60
-    max_retries: int = 3
-    retry_delay: float = 1.0
-
-
-class AIFoundryWeatherAgentError(Exception):
-    """Custom exception for AI Foundry Weather Agent errors."""
-    
-    def __init__(self, message: str, error_code: Optional[str] = None, response_data: Optional[Dict] = None):
-        super().__init__(message)
-        self.error_code = error_code
-        self.response_data = response_data
-
-
-class AIFoundryWeatherAgentClient:
-    """
-    Client for interacting with the Weather Agent using Azure AI Foundry SDK.
-    
-    This client implements Azure best practices:
-    - Uses DefaultAzureCredential for secure authentication
-    - Supports Managed Identity, Service Principal, and Interactive authentication
-    - Implements retry logic with exponential backoff for transient failures
-    - Comprehensive error handling and logging
-    - Proper resource cleanup
-    - Performance optimizations
-    """
-    
-    def __init__(self, config: AIFoundryConfig):
-        """
-        Initialize the AI Foundry Weather Agent Client.
-        
-        Args:
-            config: Configuration object containing AI Foundry project details
-        """
-        self.config = config
-        self.credential = DefaultAzureCredential()
-        self.client = self._create_client()
-        
-        logger.info(f"AI Foundry Weather Agent Client initialized for assistant {config.assistant_id}")
-        logger.info(f"Using authentication: DefaultAzureCredential")
-    
-    def _create_client(self) -> AIProjectClient:
-        """
-        Create and configure an Azure AI Foundry Project client.
-        
-        Returns:
-            Configured Azure AI Project client
-        """
-        try:
-            return AIProjectClient(
-                endpoint=self.config.endpoint,
-                credential=self.credential
-            )
-        except Exception as e:
-            error_msg = f"Failed to create AI Foundry client: {e}"
-            logger.error(error_msg)
-            raise AIFoundryWeatherAgentError(error_msg)
-    
-    def diagnose_agent(self) -> Dict[str, Any]:
-        """
-        Diagnose the agent configuration and connectivity.
-        
-        Returns:
-            Dictionary with diagnostic information
-        """
-        diagnostics = {
-            "agent_id": self.config.assistant_id,
-            "endpoint": self.config.endpoint,
-            "agent_exists": False,
-            "agent_details": None,
-            "error": None
-        }
-        
-        try:
-            agents_client = self.client.agents
-            
-            # Try to get agent details
-            try:
-                agent = agents_client.get_agent(self.config.assistant_id)
-                diagnostics["agent_exists"] = True
-                diagnostics["agent_details"] = {
-                    "id": getattr(agent, 'id', 'Unknown'),
-                    "name": getattr(agent, 'name', 'Unknown'),
-                    "description": getattr(agent, 'description', 'Unknown'),
-                    "model": getattr(agent, 'model', 'Unknown'),
-                    "tools": getattr(agent, 'tools', [])
-                }
-                logger.info(f"Agent diagnostic: Agent {self.config.assistant_id} exists and is accessible")
-            except Exception as e:
-                diagnostics["error"] = f"Cannot access agent: {e}"
-                logger.error(f"Agent diagnostic failed: {e}")
-        
-        except Exception as e:
-            diagnostics["error"] = f"Cannot access agents client: {e}"
-            logger.error(f"Agents client diagnostic failed: {e}")
-        
-        return diagnostics
-    
-    def get_weather(self, city: str) -> WeatherResult:
-        """
-        Get weather information for a specified city using Azure AI Foundry.
-        
-        Args:
-            city: Name of the city to get weather for
-            
-        Returns:
-            WeatherResult object containing weather information
-            
-        Raises:
-            AIFoundryWeatherAgentError: If the agent request fails or returns an error
-        """
-        start_time = time.time()
-        thread = None
-        
-        try:
-            # Validate input
-            weather_request = WeatherRequest(city=city)
-            
-            logger.info(f"Requesting weather for city: {city} using assistant {self.config.assistant_id}")
-            
-            # Get the agents client from the project client (following official examples)
-            agents_client = self.client.agents
-            
-            # Create a thread for the conversation
-            thread = self._create_thread_with_retry(agents_client)
-            logger.debug(f"Created thread: {thread.id}")
-            
-            # Add the user message to the thread
-            message_content = f"Get weather information for {weather_request.city}"
-            message = self._add_message_with_retry(agents_client, thread.id, message_content)
-            logger.debug(f"Added message to thread: {message.id}")
-            
-            # Run the assistant
-            run = self._run_assistant_with_retry(agents_client, thread.id)
-            logger.debug(f"Started run: {run.id}")
-            
-            # Wait for the run to complete with timeout
-            run = self._wait_for_completion(agents_client, thread.id, run.id)
-            
-            elapsed_time = time.time() - start_time
-            logger.info(f"Assistant request completed in {elapsed_time:.2f}s, status: {run.status}")
-            
-            # Check if the run completed successfully
-            if run.status != 'completed':
-                error_msg = f"Assistant run failed with status: {run.status}"
-                if hasattr(run, 'last_error') and run.last_error:
-                    error_msg += f" - {run.last_error}"
-                    # Log detailed error information
-                    logger.error(f"Detailed error info: {run.last_error}")
-                    if hasattr(run.last_error, '__dict__'):
-                        logger.error(f"Error details: {run.last_error.__dict__}")
-                
-                # Log the full run object for debugging
-                logger.error(f"Full run object: {run}")
-                if hasattr(run, '__dict__'):
-                    logger.error(f"Run details: {run.__dict__}")
-                
-                logger.error(error_msg)
-                raise AIFoundryWeatherAgentError(error_msg, error_code=run.status)
-            
-            # Get the assistant's response
-            messages = self._get_messages_with_retry(agents_client, thread.id)
-            
-            # Find the assistant's latest message
-            assistant_message = self._find_latest_assistant_message(messages)
-            
-            if not assistant_message:
-                error_msg = "No response from assistant"
-                logger.error(error_msg)
-                raise AIFoundryWeatherAgentError(error_msg)
-            
-            # Extract the content from the assistant's message
-            response_content = self._extract_message_content(assistant_message)
-            logger.debug(f"Assistant response: {response_content}")
-            
-            # Parse the weather information from the response
-            weather_result = self._parse_weather_response(response_content, city)
-            
-            logger.info(f"Successfully retrieved weather for {weather_result.city}")
-            return weather_result
-            
-        except Exception as e:
-            if isinstance(e, AIFoundryWeatherAgentError):
-                raise
-            
-            error_msg = f"Request failed: {e}"
-            logger.error(error_msg, exc_info=True)
-            raise AIFoundryWeatherAgentError(error_msg)
-        
-        finally:
-            # Cleanup: Delete the thread to free resources
-            if thread:
-                try:
-                    self.client.agents.threads.delete(thread.id)
-                    logger.debug(f"Cleaned up thread: {thread.id}")
-                except Exception as e:
-                    logger.warning(f"Failed to cleanup thread {thread.id}: {e}")
-    
-    def _create_thread_with_retry(self, agents_client: Any) -> Any:
-        """Create a thread with retry logic."""
-        for attempt in range(self.config.max_retries):
-            try:
-                return agents_client.threads.create()
-            except AzureError as e:
-                if attempt == self.config.max_retries - 1:
-                    raise
-                logger.warning(f"Thread creation attempt {attempt + 1} failed: {e}")
-                time.sleep(self.config.retry_delay * (2 ** attempt))
-        
-        raise AIFoundryWeatherAgentError("Failed to create thread after retries")
-    
-    def _add_message_with_retry(self, agents_client: Any, thread_id: str, content: str) -> Any:
-        """Add a message to thread with retry logic."""
-        for attempt in range(self.config.max_retries):
-            try:
-                return agents_client.messages.create(
-                    thread_id=thread_id,
-                    role="user",
-                    content=content
-                )
-            except AzureError as e:
-                if attempt == self.config.max_retries - 1:
-                    raise
-                logger.warning(f"Message creation attempt {attempt + 1} failed: {e}")
-                time.sleep(self.config.retry_delay * (2 ** attempt))
-        
-        raise AIFoundryWeatherAgentError("Failed to add message after retries")
-    
-    def _run_assistant_with_retry(self, agents_client: Any, thread_id: str) -> Any:
-        """Run the assistant with retry logic."""
-        for attempt in range(self.config.max_retries):
-            try:
-                return agents_client.runs.create(
-                    thread_id=thread_id,
-                    agent_id=self.config.assistant_id
-                )
-            except AzureError as e:
-                if attempt == self.config.max_retries - 1:
-                    raise
-                logger.warning(f"Run creation attempt {attempt + 1} failed: {e}")
-                time.sleep(self.config.retry_delay * (2 ** attempt))
-        
-        raise AIFoundryWeatherAgentError("Failed to run assistant after retries")
-    
-    def _get_messages_with_retry(self, agents_client: Any, thread_id: str) -> List[Any]:
-        """Get messages with retry logic."""
-        for attempt in range(self.config.max_retries):
-            try:
-                return agents_client.messages.list(thread_id=thread_id)
-            except AzureError as e:
-                if attempt == self.config.max_retries - 1:
-                    raise
-                logger.warning(f"Message retrieval attempt {attempt + 1} failed: {e}")
-                time.sleep(self.config.retry_delay * (2 ** attempt))
-        
-        raise AIFoundryWeatherAgentError("Failed to retrieve messages after retries")
-    
-    def _wait_for_completion(self, agents_client: Any, thread_id: str, run_id: str) -> Any:
-        """Wait for the run to complete with timeout."""
-        start_time = time.time()
-        
-        while True:
-            try:
-                run = agents_client.runs.get(thread_id=thread_id, run_id=run_id)
-                
-                if run.status in ['completed', 'failed', 'cancelled', 'expired']:
-                    return run
-                
-                # Check timeout
-                if time.time() - start_time > self.config.timeout:
-                    error_msg = f"Assistant run timed out after {self.config.timeout} seconds"
-                    logger.error(error_msg)
-                    raise AIFoundryWeatherAgentError(error_msg, error_code="timeout")
-                
-                # Wait before polling again
-                time.sleep(1)
-                logger.debug(f"Run status: {run.status}")
-                
-            except AzureError as e:
-                error_msg = f"Failed to get run status: {e}"
-                logger.error(error_msg)
-                raise AIFoundryWeatherAgentError(error_msg)
-    
-    def _find_latest_assistant_message(self, messages: List[Any]) -> Optional[Any]:
-        """Find the latest assistant message from the list."""
-        for message in messages:
-            if message.role == "assistant":
-                return message
-        return None
-    
-    def _extract_message_content(self, message: Any) -> str:
-        """Extract text content from a message."""
-        content = ""
-        for content_block in message.content:
-            if hasattr(content_block, 'text') and content_block.text:
-                content += content_block.text.value
-        return content
-    
-    def _parse_weather_response(self, response_content: str, requested_city: str) -> WeatherResult:
-        """
-        Parse the weather information from the assistant's response.
-        
-        Args:
-            response_content: The assistant's response content
-            requested_city: The originally requested city
-            
-        Returns:
-            WeatherResult object
-            
-        Raises:
-            AIFoundryWeatherAgentError: If parsing fails
-        """
-        try:
-            # Try to extract JSON from the response if it contains structured data
-            if "{" in response_content and "}" in response_content:
-                start = response_content.find("{")
-                end = response_content.rfind("}") + 1
-                json_str = response_content[start:end]
-                
-                try:
-                    weather_data = json.loads(json_str)
-                    if all(key in weather_data for key in ["city", "temperature", "condition", "humidity"]):
-                        return WeatherResult(**weather_data)
-                except json.JSONDecodeError:
-                    pass
-            
-            # Fallback: try to parse the response text manually
-            # This is a simple parser - in a real implementation you might want more sophisticated NLP
-            lines = response_content.strip().split('\n')
-            
-            # Initialize default values
-            city = requested_city
-            temperature = "Unknown"
-            condition = "Unknown"
-            humidity = "Unknown"
-            
-            # Try to extract information from the text
-            for line in lines:
-                line = line.strip().lower()
-                if 'temperature' in line or 'temp' in line:
-                    # Extract temperature
-                    import re
-                    temp_match = re.search(r'(\d+(?:\.\d+)?)\s*°?[cf]?', line)
-                    if temp_match:
-                        temperature = f"{temp_match.group(1)}°C"
-                
-                elif 'condition' in line or 'weather' in line:
-                    # Extract condition
-                    if 'sunny' in line:
-                        condition = "Sunny"
-                    elif 'cloudy' in line:
-                        condition = "Cloudy"
-                    elif 'rainy' in line or 'rain' in line:
-                        condition = "Rainy"
-                    elif 'clear' in line:
-                        condition = "Clear"
-                
-                elif 'humidity' in line:
-                    # Extract humidity
-                    import re
-                    humidity_match = re.search(r'(\d+(?:\.\d+)?)\s*%?', line)
-                    if humidity_match:
-                        humidity = f"{humidity_match.group(1)}%"
-            
-            return WeatherResult(
-                city=city,
-                temperature=temperature,
-                condition=condition,
-                humidity=humidity
-            )
-            
-        except Exception as e:
-            error_msg = f"Failed to parse weather response: {e}"
-            logger.error(f"{error_msg}. Response: {response_content}")
-            raise AIFoundryWeatherAgentError(error_msg, response_data=response_content)
-    
-    def __enter__(self):
-        """Context manager entry."""
-        return self
-    
-    def __exit__(self, exc_type, exc_val, exc_tb):
-        """Context manager exit with proper resource cleanup."""
-        # The AI Foundry client handles its own cleanup
-        logger.debug("AI Foundry agent client closed successfully")
-
-
-# Factory function for easy client creation
-def create_ai_foundry_weather_client(endpoint: str, assistant_id: str = "asst_14scpW964zK5TSFzjpdek9jG", **kwargs) -> AIFoundryWeatherAgentClient:
-    """
-    Factory function to create an AIFoundryWeatherAgentClient with default configuration.
-    
-    Args:
-        endpoint: Azure AI Foundry project endpoint
-        assistant_id: Assistant ID to use (defaults to weather agent)
-        **kwargs: Additional configuration parameters
-        
-    Returns:
-        Configured AIFoundryWeatherAgentClient instance
-    """
-    config = AIFoundryConfig(
-        endpoint=endpoint,
-        assistant_id=assistant_id,
-        **kwargs
-    )
-    return AIFoundryWeatherAgentClient(config)
+"""
+Azure AI Foundry Weather Agent Client
+
+This module provides a client interface to interact with the weather agent
+using Azure AI Foundry SDK with best practices including:
+- Azure Identity for secure authentication (DefaultAzureCredential)
+- Azure AI Foundry project endpoint
+- Proper error handling and retry logic
+- Structured logging and monitoring
+- Resource cleanup and connection management
+
+Best Practices Implemented:
+- Use DefaultAzureCredential for authentication (supports Managed Identity, Service Principal, etc.)
+- Never hardcode credentials
+- Implement retry logic with exponential backoff
+- Comprehensive error handling and logging
+- Proper resource cleanup
+- Input validation using Pydantic models
+"""
+
+import asyncio
+import atexit
+import functools
+import json
+import logging
+import os
+import random
+import sys
+import threading
+import time
+from typing import Optional, Dict, Any, Callable, List, Deque, Tuple
+from dataclasses import dataclass
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from azure.ai.projects import AIProjectClient
+from azure.identity import DefaultAzureCredential
+from azure.core.exceptions import AzureError, HttpResponseError, ServiceRequestError, ServiceResponseError
+from azure.core.pipeline.transport import RequestsTransport
+from pydantic import BaseModel, Field, field_validator
+
+from _parser import extract_weather_json, parse_weather_text
+
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+
+# Decoder reused by the streaming short-circuit check
+_JSON_DECODER = json.JSONDecoder()
+
+# Constant prompt fragments, built (and interned) once instead of
+# re-allocated per request; _USER_KW likewise avoids a per-call kwargs dict
+_WEATHER_PROMPT_PREFIX = sys.intern("Get weather information for ")
+_BATCH_PROMPT_PREFIX = sys.intern(
+    'Return a JSON array of weather objects '
+    '{"city", "temperature", "condition", "humidity"} for: '
+)
+_USER_KW = {"role": "user"}
+
+# HTTP statuses that will never succeed on retry; retrying them only burns
+# the full backoff budget and holds pooled connections for nothing
+_NON_RETRYABLE_STATUS = frozenset({400, 401, 403, 404})
+
+
+def _is_non_retryable(error: AzureError) -> bool:
+    """Return True when the error is a permanent HTTP failure (4xx auth/not-found)."""
+    if isinstance(error, (ServiceRequestError, ServiceResponseError)):
+        # Transient network-level failures: always worth retrying
+        return False
+    return (
+        isinstance(error, HttpResponseError)
+        and getattr(error, "status_code", None) in _NON_RETRYABLE_STATUS
+    )
+
+
+def _retry_after_seconds(error: AzureError) -> Optional[float]:
+    """Extract the service's Retry-After hint from a throttling response, if any."""
+    response = getattr(error, "response", None)
+    if response is None:
+        return None
+    retry_after = getattr(response, "headers", {}).get("retry-after")
+    if retry_after is None:
+        return None
+    try:
+        return float(retry_after)
+    except (TypeError, ValueError):
+        return None
+
+
+# Process-wide shared HTTP session and credential. Re-creating these per
+# client (or per CLI invocation within one process) repeats the TLS
+# handshake to the AAD and AI project endpoints; sharing them lets every
+# request reuse the same connection pool and token cache.
+_SHARED_SESSION: Optional[requests.Session] = None
+_SHARED_CREDENTIAL: Optional[DefaultAzureCredential] = None
+_shared_lock = threading.Lock()
+
+
+def _get_shared_session(pool_maxsize: int = 50) -> requests.Session:
+    """Return the process-wide requests.Session with a bumped connection pool."""
+    global _SHARED_SESSION
+    with _shared_lock:
+        if _SHARED_SESSION is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=10, pool_maxsize=pool_maxsize)
+            session.mount('https://', adapter)
+            session.mount('http://', adapter)
+            _SHARED_SESSION = session
+        return _SHARED_SESSION
+
+
+def _build_credential(credential_type: str) -> Any:
+    """Build a token credential for the requested type.
+
+    Narrower chains skip DefaultAzureCredential's probe of credential
+    sources the environment can never satisfy (each failed probe can cost
+    a subprocess spawn or an IMDS timeout).
+    """
+    if credential_type == "managed":
+        from azure.identity import ManagedIdentityCredential
+        return ManagedIdentityCredential(client_id=os.getenv("AZURE_CLIENT_ID"))
+    if credential_type == "cli":
+        from azure.identity import AzureCliCredential
+        return AzureCliCredential()
+    if credential_type == "chained":
+        from azure.identity import ChainedTokenCredential, EnvironmentCredential, ManagedIdentityCredential
+        return ChainedTokenCredential(EnvironmentCredential(), ManagedIdentityCredential())
+    return DefaultAzureCredential()
+
+
+def _get_shared_credential() -> Any:
+    """Return the process-wide token credential (token caching is built in).
+
+    The credential type can be narrowed via the AZURE_CREDENTIAL_TYPE
+    environment variable (managed | cli | chained); the default remains the
+    full DefaultAzureCredential chain.
+    """
+    global _SHARED_CREDENTIAL
+    with _shared_lock:
+        if _SHARED_CREDENTIAL is None:
+            credential_type = os.getenv("AZURE_CREDENTIAL_TYPE", "").strip().lower()
+            _SHARED_CREDENTIAL = _build_credential(credential_type)
+        return _SHARED_CREDENTIAL
+
+
+# Background executor for off-critical-path cleanup (thread deletion).
+# Deleting a thread costs a full round-trip that the caller never benefits
+# from, so it runs after the result has already been returned.
+_CLEANUP_POOL = ThreadPoolExecutor(max_workers=2, thread_name_prefix="aif-cleanup")
+atexit.register(_CLEANUP_POOL.shutdown, wait=True)
+
+
+class WeatherRequest(BaseModel):
+    """Pydantic model for weather request validation."""
+    
+    city: str = Field(..., min_length=1, description="City name to get weather for")
+    
+    @field_validator('city')
+    def validate_city(cls, v):
+        """Validate city name format."""
+        if not v.strip():
+            raise ValueError("City name cannot be empty")
+        return v.strip()
+
+
+class WeatherResult(BaseModel):
+    """Pydantic model for weather response."""
+    
+    city: str
+    temperature: str
+    condition: str
+    humidity: str
+
+
+@dataclass
+class AIFoundryConfig:
+    """Configuration for the Azure AI Foundry Weather Agent Client."""
+    
+    endpoint: str
+    assistant_id: str = "asst_14scpW964zK5TSFzjpdek9jG"
+    timeout: int = 60
+    max_retries: int = 3
+    retry_delay: float = 1.0
+    cache_ttl: float = 600.0  # seconds; 0 disables result caching
+    cache_maxsize: int = 1024
+    thread_pool_size: int = 0  # > 0 reuses service-side threads instead of create/delete per call
+    thread_max_uses: int = 4  # rotate a pooled thread after this many runs
+    use_streaming: bool = False  # stream run output instead of waiting for completion
+
+
+class AIFoundryWeatherAgentError(Exception):
+    """Custom exception for AI Foundry Weather Agent errors."""
+    
+    def __init__(self, message: str, error_code: Optional[str] = None, response_data: Optional[Dict] = None):
+        super().__init__(message)
+        self.error_code = error_code
+        self.response_data = response_data
+
+
+class AIFoundryWeatherAgentClient:
+    """
+    Client for interacting with the Weather Agent using Azure AI Foundry SDK.
+    
+    This client implements Azure best practices:
+    - Uses DefaultAzureCredential for secure authentication
+    - Supports Managed Identity, Service Principal, and Interactive authentication
+    - Implements retry logic with exponential backoff for transient failures
+    - Comprehensive error handling and logging
+    - Proper resource cleanup
+    - Performance optimizations
+    """
+    
+    def __init__(self, config: AIFoundryConfig):
+        """
+        Initialize the AI Foundry Weather Agent Client.
+        
+        Args:
+            config: Configuration object containing AI Foundry project details
+        """
+        self.config = config
+        self.credential = _get_shared_credential()
+        self.client = self._create_client()
+
+        # Bounded TTL cache for weather results keyed by normalized city name.
+        # Weather lookups are side-effect free, so repeated requests within
+        # the TTL window can skip the agent round-trip entirely.
+        self._cache: Dict[str, Any] = {}
+        self._cache_lock = threading.Lock()
+
+        # Singleflight map of in-flight requests keyed by normalized city name.
+        # Concurrent identical lookups wait on the first caller's Future
+        # instead of each firing their own agent run.
+        self._inflight: Dict[str, Future] = {}
+        self._inflight_lock = threading.Lock()
+
+        # Optional pool of reusable service-side threads. Creating and
+        # deleting a thread per call costs two HTTP round-trips; with
+        # thread_pool_size > 0 threads are recycled instead. Entries are
+        # (thread_id, uses): threads rotate out after thread_max_uses runs
+        # so accumulated history stays bounded, and _thread_uses tracks
+        # the count while a thread is checked out.
+        self._thread_pool: Deque[Tuple[str, int]] = deque()
+        self._thread_uses: Dict[str, int] = {}
+        self._thread_pool_lock = threading.Lock()
+
+        logger.info(f"AI Foundry Weather Agent Client initialized for assistant {config.assistant_id}")
+        logger.info(f"Using authentication: {type(self.credential).__name__}")
+    
+    def _create_client(self) -> AIProjectClient:
+        """
+        Create and configure an Azure AI Foundry Project client.
+        
+        Returns:
+            Configured Azure AI Project client
+        """
+        try:
+            return AIProjectClient(
+                endpoint=self.config.endpoint,
+                credential=self.credential,
+                # Reuse the shared session so every client shares one
+                # TCP+TLS connection pool instead of handshaking per instance
+                transport=RequestsTransport(session=_get_shared_session(), session_owner=False)
+            )
+        except Exception as e:
+            error_msg = f"Failed to create AI Foundry client: {e}"
+            logger.error(error_msg)
+            raise AIFoundryWeatherAgentError(error_msg)
+    
+    def _cache_get(self, key: str) -> Optional[WeatherResult]:
+        """Return a cached WeatherResult for the key, or None if missing/expired."""
+        if self.config.cache_ttl <= 0:
+            return None
+        with self._cache_lock:
+            entry = self._cache.get(key)
+            if entry is None:
+                return None
+            expires_at, result = entry
+            if time.time() >= expires_at:
+                del self._cache[key]
+                return None
+            return result
+
+    def _cache_put(self, key: str, result: WeatherResult) -> None:
+        """Store a WeatherResult in the TTL cache, evicting stale entries when full."""
+        if self.config.cache_ttl <= 0:
+            return
+        with self._cache_lock:
+            if len(self._cache) >= self.config.cache_maxsize:
+                now = time.time()
+                # Drop expired entries first; if none expired, drop the oldest
+                expired = [k for k, (exp, _) in self._cache.items() if now >= exp]
+                for k in expired:
+                    del self._cache[k]
+                if len(self._cache) >= self.config.cache_maxsize:
+                    oldest = min(self._cache, key=lambda k: self._cache[k][0])
+                    del self._cache[oldest]
+            self._cache[key] = (time.time() + self.config.cache_ttl, result)
+
+    def _acquire_thread(self, agents_client: Any) -> str:
+        """Get a thread ID from the reuse pool, or create a new thread."""
+        if self.config.thread_pool_size > 0:
+            with self._thread_pool_lock:
+                if self._thread_pool:
+                    thread_id, uses = self._thread_pool.popleft()
+                    self._thread_uses[thread_id] = uses
+                    logger.debug("Reusing pooled thread: %s (use %d)", thread_id, uses + 1)
+                    return thread_id
+        return self._create_thread_with_retry(agents_client).id
+
+    def _release_thread(self, thread_id: str, run_completed: bool = True) -> None:
+        """Return a thread to the pool, or delete it when it can't be reused.
+
+        A thread is only pooled when its run completed — a thread whose
+        run failed mid-flight is in an unknown state and must not serve
+        another request — and only until it has served thread_max_uses
+        runs, so the message history it replays to the model stays
+        bounded instead of growing with every reuse.
+        """
+        with self._thread_pool_lock:
+            uses = self._thread_uses.pop(thread_id, 0) + 1
+            if (
+                run_completed
+                and self.config.thread_pool_size > 0
+                and uses < self.config.thread_max_uses
+                and len(self._thread_pool) < self.config.thread_pool_size
+            ):
+                self._thread_pool.append((thread_id, uses))
+                logger.debug("Returned thread to pool: %s (%d uses)", thread_id, uses)
+                return
+        # Fire-and-forget: deletion is pure overhead on the critical path,
+        # so hand it to the background cleanup executor
+        _CLEANUP_POOL.submit(self._delete_thread, thread_id)
+
+    def _delete_thread(self, thread_id: str) -> None:
+        """Delete a service-side thread, logging instead of raising on failure."""
+        try:
+            self.client.agents.threads.delete(thread_id)
+            logger.debug("Cleaned up thread: %s", thread_id)
+        except Exception as e:
+            logger.warning(f"Failed to cleanup thread {thread_id}: {e}")
+
+    def _drain_thread_pool(self) -> None:
+        """Delete any pooled threads (called on client shutdown)."""
+        with self._thread_pool_lock:
+            pooled = [thread_id for thread_id, _ in self._thread_pool]
+            self._thread_pool.clear()
+        for thread_id in pooled:
+            self._delete_thread(thread_id)
+
+    def diagnose_agent(self) -> Dict[str, Any]:
+        """
+        Diagnose the agent configuration and connectivity.
+        
+        Returns:
+            Dictionary with diagnostic information
+        """
+        diagnostics = {
+            "agent_id": self.config.assistant_id,
+            "endpoint": self.config.endpoint,
+            "agent_exists": False,
+            "agent_details": None,
+            "error": None
+        }
+        
+        try:
+            agents_client = self.client.agents
+            
+            # Try to get agent details
+            try:
+                agent = agents_client.get_agent(self.config.assistant_id)
+                diagnostics["agent_exists"] = True
+                diagnostics["agent_details"] = {
+                    "id": getattr(agent, 'id', 'Unknown'),
+                    "name": getattr(agent, 'name', 'Unknown'),
+                    "description": getattr(agent, 'description', 'Unknown'),
+                    "model": getattr(agent, 'model', 'Unknown'),
+                    "tools": getattr(agent, 'tools', [])
+                }
+                logger.info(f"Agent diagnostic: Agent {self.config.assistant_id} exists and is accessible")
+            except Exception as e:
+                diagnostics["error"] = f"Cannot access agent: {e}"
+                logger.error(f"Agent diagnostic failed: {e}")
+        
+        except Exception as e:
+            diagnostics["error"] = f"Cannot access agents client: {e}"
+            logger.error(f"Agents client diagnostic failed: {e}")
+        
+        return diagnostics
+    
+    def get_weather(self, city: str) -> WeatherResult:
+        """
+        Get weather information for a specified city using Azure AI Foundry.
+
+        Repeated lookups are served from the TTL cache, and concurrent
+        identical lookups are coalesced so only one agent run is in flight
+        per city at a time.
+
+        Args:
+            city: Name of the city to get weather for
+
+        Returns:
+            WeatherResult object containing weather information
+
+        Raises:
+            AIFoundryWeatherAgentError: If the agent request fails or returns an error
+        """
+        # Lightweight inline validation on the hot path; the WeatherRequest
+        # model remains the validation surface for external callers
+        normalized_city = city.strip() if isinstance(city, str) else ""
+        if not normalized_city:
+            error_msg = "Request failed: City name cannot be empty"
+            logger.error(error_msg)
+            raise AIFoundryWeatherAgentError(error_msg)
+
+        # Serve repeated lookups from the TTL cache without an agent round-trip
+        cache_key = normalized_city.lower()
+        cached_result = self._cache_get(cache_key)
+        if cached_result is not None:
+            logger.info(f"Returning cached weather for {normalized_city}")
+            return cached_result
+
+        # Singleflight: if an identical request is already in flight,
+        # wait for its result instead of starting another agent run
+        with self._inflight_lock:
+            existing = self._inflight.get(cache_key)
+            if existing is not None:
+                logger.debug("Joining in-flight request for %s", normalized_city)
+                join_existing = True
+            else:
+                future: Future = Future()
+                self._inflight[cache_key] = future
+                join_existing = False
+
+        if join_existing:
+            return existing.result()
+
+        try:
+            weather_result = self._fetch_weather(normalized_city, city)
+
+            # Cache the result so repeated lookups within the TTL skip the agent
+            self._cache_put(cache_key, weather_result)
+
+            future.set_result(weather_result)
+            return weather_result
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self._inflight_lock:
+                self._inflight.pop(cache_key, None)
+
+    def _fetch_weather(self, normalized_city: str, city: str) -> WeatherResult:
+        """
+        Execute the full agent round-trip for a single validated request.
+
+        Args:
+            normalized_city: Validated, stripped city name
+            city: The originally requested city string
+
+        Returns:
+            WeatherResult object containing weather information
+
+        Raises:
+            AIFoundryWeatherAgentError: If the agent request fails or returns an error
+        """
+        start_time = time.time()
+        thread_id = None
+        run_completed = False
+
+        try:
+            logger.info(f"Requesting weather for city: {city} using assistant {self.config.assistant_id}")
+
+            # Get the agents client from the project client (following official examples)
+            agents_client = self.client.agents
+
+            # Get a thread for the conversation (pooled or newly created)
+            thread_id = self._acquire_thread(agents_client)
+            logger.debug("Using thread: %s", thread_id)
+
+            # Add the user message to the thread
+            message_content = _WEATHER_PROMPT_PREFIX + normalized_city
+            message = self._add_message_with_retry(agents_client, thread_id, message_content)
+            logger.debug("Added message to thread: %s", message.id)
+
+            response_content = None
+            if self.config.use_streaming:
+                # Stream tokens as they are generated so parsing can start
+                # before the run formally completes; falls back to the
+                # blocking path if streaming is unavailable or yields nothing
+                try:
+                    response_content = self._run_with_stream(agents_client, thread_id)
+                except AzureError as e:
+                    logger.warning(f"Streaming run failed, falling back to polling: {e}")
+
+            if response_content is None:
+                # Create the run and process it to a terminal state in a single
+                # SDK call instead of a separate create plus client-side polling
+                run = self._retry(
+                    "Run execution",
+                    lambda: agents_client.runs.create_and_process(
+                        thread_id=thread_id,
+                        agent_id=self.config.assistant_id,
+                        polling_interval=0.5
+                    )
+                )
+
+                elapsed_time = time.time() - start_time
+                logger.info(f"Assistant request completed in {elapsed_time:.2f}s, status: {run.status}")
+
+                # Check if the run completed successfully
+                if run.status != 'completed':
+                    error_msg = f"Assistant run failed with status: {run.status}"
+                    last_error = getattr(run, 'last_error', None)
+                    if last_error:
+                        error_msg += f" - {last_error}"
+
+                    # Log a compact summary instead of stringifying the full
+                    # run object (whose __dict__ can embed the HTTP response)
+                    logger.error("Run failed: %s", self._summarize_run(run))
+                    logger.error(error_msg)
+                    raise AIFoundryWeatherAgentError(error_msg, error_code=run.status)
+
+                # Get the assistant's response
+                messages = self._get_messages_with_retry(agents_client, thread_id)
+
+                # Find the assistant's latest message
+                assistant_message = self._find_latest_assistant_message(messages)
+
+                if not assistant_message:
+                    error_msg = "No response from assistant"
+                    logger.error(error_msg)
+                    raise AIFoundryWeatherAgentError(error_msg)
+
+                # Extract the content from the assistant's message
+                response_content = self._extract_message_content(assistant_message)
+                logger.debug("Assistant response: %s", response_content)
+
+                # The run reached a terminal state and its response was
+                # retrieved, so the thread is in a known state and safe
+                # to pool. The streaming path deliberately never sets
+                # this: it can leave the stream before the run finishes,
+                # so its thread is deleted rather than reused.
+                run_completed = True
+
+            # Parse the weather information from the response
+            weather_result = self._parse_weather_response(response_content, city)
+
+            logger.info(f"Successfully retrieved weather for {weather_result.city}")
+            return weather_result
+
+        except Exception as e:
+            if isinstance(e, AIFoundryWeatherAgentError):
+                raise
+
+            error_msg = f"Request failed: {e}"
+            logger.error(error_msg, exc_info=True)
+            raise AIFoundryWeatherAgentError(error_msg)
+
+        finally:
+            # Cleanup: Return the thread to the pool (or delete it) to free resources
+            if thread_id:
+                self._release_thread(thread_id, run_completed)
+    
+    def _summarize_run(self, run: Any) -> Dict[str, Any]:
+        """Return a compact id/status/last_error summary of a run for logging."""
+        last_error = getattr(run, 'last_error', None)
+        return {
+            "id": getattr(run, 'id', None),
+            "status": getattr(run, 'status', None),
+            "last_error": str(last_error) if last_error else None,
+        }
+
+    def _run_with_stream(self, agents_client: Any, thread_id: str) -> Optional[str]:
+        """
+        Run the assistant with streaming and return the accumulated text.
+
+        Text deltas are collected as they arrive, and the stream is left
+        early once a complete JSON object has been received — the parser
+        does not need the trailing prose. Returns None when the SDK does
+        not support streaming or no text was produced, so the caller can
+        fall back to the blocking run path.
+        """
+        try:
+            stream_ctx = agents_client.runs.stream(
+                thread_id=thread_id,
+                agent_id=self.config.assistant_id
+            )
+        except (AttributeError, TypeError):
+            logger.debug("Streaming not supported by this SDK version")
+            return None
+
+        chunks: List[str] = []
+        with stream_ctx as stream:
+            for event in stream:
+                # Events arrive as (event_type, event_data, ...) tuples
+                data = event[1] if isinstance(event, tuple) and len(event) > 1 else event
+                delta_text = self._extract_delta_text(data)
+                if not delta_text:
+                    continue
+                chunks.append(delta_text)
+
+                # Short-circuit once a complete JSON object has arrived
+                text = ''.join(chunks)
+                start = text.find('{')
+                if start >= 0:
+                    try:
+                        _JSON_DECODER.raw_decode(text, start)
+                        break
+                    except json.JSONDecodeError:
+                        pass
+
+        return ''.join(chunks) or None
+
+    def _extract_delta_text(self, event_data: Any) -> str:
+        """Pull the text fragment out of a streaming delta event, if any."""
+        delta = getattr(event_data, 'delta', None)
+        if delta is None:
+            return ""
+        return ''.join(
+            block.text.value
+            for block in getattr(delta, 'content', None) or []
+            if getattr(block, 'text', None) and getattr(block.text, 'value', None)
+        )
+
+    def get_weather_batch(self, cities: List[str]) -> List[WeatherResult]:
+        """
+        Get weather information for multiple cities in a single agent run.
+
+        Instead of one thread/message/run/poll cycle per city, this creates
+        ONE thread, posts a single message listing all cities, runs the
+        assistant once, and splits the returned JSON array — collapsing the
+        per-city network round trips into a constant number.
+
+        Args:
+            cities: List of city names to get weather for
+
+        Returns:
+            List of WeatherResult objects, one per requested city
+
+        Raises:
+            AIFoundryWeatherAgentError: If the agent request fails or returns an error
+        """
+        start_time = time.time()
+        thread = None
+
+        try:
+            # Validate input
+            validated = [WeatherRequest(city=city).city for city in cities]
+            if not validated:
+                raise AIFoundryWeatherAgentError("No cities provided for batch request")
+
+            logger.info(f"Requesting weather for {len(validated)} cities using assistant {self.config.assistant_id}")
+
+            agents_client = self.client.agents
+
+            # Create a single thread for the whole batch
+            thread = self._create_thread_with_retry(agents_client)
+            logger.debug("Created thread: %s", thread.id)
+
+            # One message covering all cities, asking for structured output
+            message_content = _BATCH_PROMPT_PREFIX + ", ".join(validated)
+            message = self._add_message_with_retry(agents_client, thread.id, message_content)
+            logger.debug("Added batch message to thread: %s", message.id)
+
+            # Run the assistant once for all cities, processed server-side
+            run = self._retry(
+                "Run execution",
+                lambda: agents_client.runs.create_and_process(
+                    thread_id=thread.id,
+                    agent_id=self.config.assistant_id,
+                    polling_interval=0.5
+                )
+            )
+
+            elapsed_time = time.time() - start_time
+            logger.info(f"Batch assistant request completed in {elapsed_time:.2f}s, status: {run.status}")
+
+            if run.status != 'completed':
+                error_msg = f"Assistant run failed with status: {run.status}"
+                if hasattr(run, 'last_error') and run.last_error:
+                    error_msg += f" - {run.last_error}"
+                logger.error(error_msg)
+                raise AIFoundryWeatherAgentError(error_msg, error_code=run.status)
+
+            # Get the assistant's response
+            messages = self._get_messages_with_retry(agents_client, thread.id)
+            assistant_message = self._find_latest_assistant_message(messages)
+
+            if not assistant_message:
+                error_msg = "No response from assistant"
+                logger.error(error_msg)
+                raise AIFoundryWeatherAgentError(error_msg)
+
+            response_content = self._extract_message_content(assistant_message)
+            logger.debug("Assistant batch response: %s", response_content)
+
+            results = self._parse_weather_batch_response(response_content, validated)
+
+            logger.info(f"Successfully retrieved weather for {len(results)} cities")
+            return results
+
+        except Exception as e:
+            if isinstance(e, AIFoundryWeatherAgentError):
+                raise
+
+            error_msg = f"Batch request failed: {e}"
+            logger.error(error_msg, exc_info=True)
+            raise AIFoundryWeatherAgentError(error_msg)
+
+        finally:
+            # Cleanup: Delete the thread off the critical path
+            if thread:
+                _CLEANUP_POOL.submit(self._delete_thread, thread.id)
+
+    def _parse_weather_batch_response(self, response_content: str, requested_cities: List[str]) -> List[WeatherResult]:
+        """
+        Parse a JSON array of weather objects from the assistant's batch response.
+
+        Results are matched to the request by the echoed city name rather
+        than by array position — the model may reorder, skip, or rename
+        entries, and positional zip would then attribute weather to the
+        wrong city. Any requested city missing from the array is fetched
+        individually through get_weather, so the returned list is always
+        aligned one-to-one with requested_cities.
+
+        Args:
+            response_content: The assistant's response content
+            requested_cities: The originally requested cities, in order
+
+        Returns:
+            List of WeatherResult objects, one per requested city, in order
+
+        Raises:
+            AIFoundryWeatherAgentError: If parsing fails, or a missing
+                city's individual fetch fails
+        """
+        try:
+            parsed_by_city: Dict[str, WeatherResult] = {}
+            if "[" in response_content and "]" in response_content:
+                start = response_content.find("[")
+                end = response_content.rfind("]") + 1
+                json_str = response_content[start:end]
+
+                try:
+                    weather_items = json.loads(json_str)
+                    if isinstance(weather_items, list):
+                        for item in weather_items:
+                            if isinstance(item, dict) and all(
+                                key in item for key in ["city", "temperature", "condition", "humidity"]
+                            ):
+                                # Keys verified above; use the model_construct fast path
+                                result = WeatherResult.model_construct(
+                                    city=str(item["city"]),
+                                    temperature=str(item["temperature"]),
+                                    condition=str(item["condition"]),
+                                    humidity=str(item["humidity"])
+                                )
+                                parsed_by_city.setdefault(result.city.strip().casefold(), result)
+                except json.JSONDecodeError:
+                    pass
+
+            results = []
+            for city in requested_cities:
+                result = parsed_by_city.get(city.strip().casefold())
+                if result is None:
+                    # Covers skipped cities, aliases the model renamed
+                    # ("NYC" -> "New York City"), and a fully unparseable
+                    # response alike: the per-city path guarantees the
+                    # answer is attributed to the right request
+                    logger.warning(f"City '{city}' missing from batch response, fetching individually")
+                    result = self.get_weather(city)
+                results.append(result)
+            return results
+
+        except Exception as e:
+            if isinstance(e, AIFoundryWeatherAgentError):
+                raise
+            error_msg = f"Failed to parse batch weather response: {e}"
+            logger.error(f"{error_msg}. Response: {response_content}")
+            raise AIFoundryWeatherAgentError(error_msg, response_data=response_content)
+
+    def _retry(self, operation_name: str, operation: Callable[[], Any]) -> Any:
+        """
+        Run an operation with retry logic, exponential backoff, and jitter.
+
+        Equal jitter spreads retry arrivals from concurrent callers so they
+        don't re-hammer a throttled service in lockstep. The sleep is capped
+        so retries cannot consume more than the configured timeout.
+
+        Permanent HTTP failures (400/401/403/404) are re-raised immediately —
+        they cannot succeed on retry, so backing off just wastes the full
+        retry budget. When the service sends a Retry-After hint (throttling),
+        that takes precedence over the computed backoff.
+
+        Args:
+            operation_name: Human-readable name used in log/error messages
+            operation: Zero-argument callable performing the SDK call
+
+        Raises:
+            AzureError: If the final attempt fails, or immediately for
+                non-retryable HTTP statuses
+        """
+        for attempt in range(self.config.max_retries):
+            try:
+                return operation()
+            except AzureError as e:
+                if _is_non_retryable(e):
+                    logger.error(f"{operation_name} failed with non-retryable error: {e}")
+                    raise
+                if attempt == self.config.max_retries - 1:
+                    raise
+                logger.warning(f"{operation_name} attempt {attempt + 1} failed: {e}")
+                retry_after = _retry_after_seconds(e)
+                if retry_after is not None:
+                    delay = retry_after
+                else:
+                    delay = self.config.retry_delay * (2 ** attempt)
+                    delay *= 0.5 + random.random() / 2  # equal jitter
+                time.sleep(min(delay, self.config.timeout / self.config.max_retries))
+
+        raise AIFoundryWeatherAgentError(f"{operation_name} failed after retries")
+
+    def _create_thread_with_retry(self, agents_client: Any) -> Any:
+        """Create a thread with retry logic."""
+        return self._retry("Thread creation", agents_client.threads.create)
+
+    def _add_message_with_retry(self, agents_client: Any, thread_id: str, content: str) -> Any:
+        """Add a message to thread with retry logic."""
+        return self._retry(
+            "Message creation",
+            lambda: agents_client.messages.create(
+                thread_id=thread_id,
+                content=content,
+                **_USER_KW
+            )
+        )
+
+    def _get_messages_with_retry(self, agents_client: Any, thread_id: str) -> List[Any]:
+        """Get messages with retry logic, newest first and capped server-side."""
+        # Only the latest message is needed; asking the server for a single
+        # newest-first entry avoids transferring the whole thread history
+        return self._retry(
+            "Message retrieval",
+            lambda: agents_client.messages.list(
+                thread_id=thread_id,
+                order="desc",
+                limit=1
+            )
+        )
+    
+    def _find_latest_assistant_message(self, messages: List[Any]) -> Optional[Any]:
+        """Find the latest assistant message from the list.
+
+        Messages arrive newest-first, so this returns on the first match.
+        """
+        for message in messages:
+            if message.role == "assistant":
+                return message
+        return None
+    
+    def _extract_message_content(self, message: Any) -> str:
+        """Extract text content from a message."""
+        # ''.join over a generator is linear-time, unlike += concatenation
+        # which re-allocates the accumulated string on every block
+        return ''.join(
+            block.text.value
+            for block in message.content
+            if getattr(block, 'text', None)
+        )
+    
+    def _parse_weather_response(self, response_content: str, requested_city: str) -> WeatherResult:
+        """
+        Parse the weather information from the assistant's response.
+        
+        Args:
+            response_content: The assistant's response content
+            requested_city: The originally requested city
+            
+        Returns:
+            WeatherResult object
+            
+        Raises:
+            AIFoundryWeatherAgentError: If parsing fails
+        """
+        try:
+            # Try to extract JSON from the response if it contains structured data
+            weather_data = extract_weather_json(response_content)
+            if weather_data is not None:
+                # Keys are verified by the extractor, so skip the validator
+                # chain via the Pydantic v2 model_construct fast path
+                return WeatherResult.model_construct(**weather_data)
+
+            # Fallback: parse the response text manually; this path is
+            # untrusted, so keep full model validation
+            return WeatherResult(**parse_weather_text(response_content, requested_city))
+
+        except Exception as e:
+            error_msg = f"Failed to parse weather response: {e}"
+            logger.error(f"{error_msg}. Response: {response_content}")
+            raise AIFoundryWeatherAgentError(error_msg, response_data=response_content)
+    
+    def __enter__(self):
+        """Context manager entry."""
+        return self
+    
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        """Context manager exit with proper resource cleanup."""
+        # Delete any pooled threads; the AI Foundry client handles its own cleanup
+        self._drain_thread_pool()
+        logger.debug("AI Foundry agent client closed successfully")
+
+
+class AIFoundryWeatherAgentClientAsync:
+    """
+    Asynchronous client for interacting with the Weather Agent using Azure AI Foundry SDK.
+
+    Mirrors AIFoundryWeatherAgentClient but uses the async SDK surface
+    (azure.ai.projects.aio / azure.identity.aio) so that concurrent
+    get_weather calls share a single event loop thread instead of blocking
+    one thread each. Run polling uses a sub-second asyncio.sleep tick, which
+    removes the 1-second quantization floor of the sync polling loop.
+
+    For one-shot CLI use the async client can still be driven synchronously:
+
+        result = asyncio.run(client.get_weather("Milan"))
+    """
+
+    # Poll interval for run-status checks (seconds). Sub-second is cheap here
+    # because the coroutine yields the event loop while waiting.
+    POLL_INTERVAL = 0.25
+
+    def __init__(self, config: AIFoundryConfig):
+        """
+        Initialize the async AI Foundry Weather Agent Client.
+
+        Args:
+            config: Configuration object containing AI Foundry project details
+        """
+        from azure.ai.projects.aio import AIProjectClient as AsyncAIProjectClient
+        from azure.identity.aio import DefaultAzureCredential as AsyncDefaultAzureCredential
+
+        self.config = config
+        self.credential = AsyncDefaultAzureCredential()
+
+        try:
+            self.client = AsyncAIProjectClient(
+                endpoint=self.config.endpoint,
+                credential=self.credential
+            )
+        except Exception as e:
+            error_msg = f"Failed to create AI Foundry client: {e}"
+            logger.error(error_msg)
+            raise AIFoundryWeatherAgentError(error_msg)
+
+        logger.info(f"Async AI Foundry Weather Agent Client initialized for assistant {config.assistant_id}")
+
+    async def get_weather(self, city: str) -> WeatherResult:
+        """
+        Get weather information for a specified city using Azure AI Foundry.
+
+        Args:
+            city: Name of the city to get weather for
+
+        Returns:
+            WeatherResult object containing weather information
+
+        Raises:
+            AIFoundryWeatherAgentError: If the agent request fails or returns an error
+        """
+        start_time = time.time()
+        thread = None
+
+        try:
+            # Validate input
+            weather_request = WeatherRequest(city=city)
+
+            logger.info(f"Requesting weather for city: {city} using assistant {self.config.assistant_id}")
+
+            agents_client = self.client.agents
+
+            # Create a thread for the conversation
+            thread = await self._create_thread_with_retry(agents_client)
+            logger.debug("Created thread: %s", thread.id)
+
+            # Add the user message to the thread
+            message_content = _WEATHER_PROMPT_PREFIX + weather_request.city
+            message = await self._add_message_with_retry(agents_client, thread.id, message_content)
+            logger.debug("Added message to thread: %s", message.id)
+
+            # Run the assistant
+            run = await self._run_assistant_with_retry(agents_client, thread.id)
+            logger.debug("Started run: %s", run.id)
+
+            # Wait for the run to complete with timeout
+            run = await self._wait_for_completion(agents_client, thread.id, run.id)
+
+            elapsed_time = time.time() - start_time
+            logger.info(f"Assistant request completed in {elapsed_time:.2f}s, status: {run.status}")
+
+            # Check if the run completed successfully
+            if run.status != 'completed':
+                error_msg = f"Assistant run failed with status: {run.status}"
+                if hasattr(run, 'last_error') and run.last_error:
+                    error_msg += f" - {run.last_error}"
+                logger.error(error_msg)
+                raise AIFoundryWeatherAgentError(error_msg, error_code=run.status)
+
+            # Get the assistant's response
+            messages = await self._get_messages_with_retry(agents_client, thread.id)
+
+            # Find the assistant's latest message
+            assistant_message = self._find_latest_assistant_message(messages)
+
+            if not assistant_message:
+                error_msg = "No response from assistant"
+                logger.error(error_msg)
+                raise AIFoundryWeatherAgentError(error_msg)
+
+            # Extract and parse the content from the assistant's message
+            response_content = self._extract_message_content(assistant_message)
+            logger.debug("Assistant response: %s", response_content)
+
+            weather_result = self._parse_weather_response(response_content, city)
+
+            logger.info(f"Successfully retrieved weather for {weather_result.city}")
+            return weather_result
+
+        except Exception as e:
+            if isinstance(e, AIFoundryWeatherAgentError):
+                raise
+
+            error_msg = f"Request failed: {e}"
+            logger.error(error_msg, exc_info=True)
+            raise AIFoundryWeatherAgentError(error_msg)
+
+        finally:
+            # Cleanup: Delete the thread to free resources
+            if thread:
+                try:
+                    await self.client.agents.threads.delete(thread.id)
+                    logger.debug("Cleaned up thread: %s", thread.id)
+                except Exception as e:
+                    logger.warning(f"Failed to cleanup thread {thread.id}: {e}")
+
+    async def _create_thread_with_retry(self, agents_client: Any) -> Any:
+        """Create a thread with retry logic."""
+        for attempt in range(self.config.max_retries):
+            try:
+                return await agents_client.threads.create()
+            except AzureError as e:
+                if _is_non_retryable(e):
+                    raise
+                if attempt == self.config.max_retries - 1:
+                    raise
+                logger.warning(f"Thread creation attempt {attempt + 1} failed: {e}")
+                await asyncio.sleep(self.config.retry_delay * (2 ** attempt))
+
+        raise AIFoundryWeatherAgentError("Failed to create thread after retries")
+
+    async def _add_message_with_retry(self, agents_client: Any, thread_id: str, content: str) -> Any:
+        """Add a message to thread with retry logic."""
+        for attempt in range(self.config.max_retries):
+            try:
+                return await agents_client.messages.create(
+                    thread_id=thread_id,
+                    role="user",
+                    content=content
+                )
+            except AzureError as e:
+                if _is_non_retryable(e):
+                    raise
+                if attempt == self.config.max_retries - 1:
+                    raise
+                logger.warning(f"Message creation attempt {attempt + 1} failed: {e}")
+                await asyncio.sleep(self.config.retry_delay * (2 ** attempt))
+
+        raise AIFoundryWeatherAgentError("Failed to add message after retries")
+
+    async def _run_assistant_with_retry(self, agents_client: Any, thread_id: str) -> Any:
+        """Run the assistant with retry logic."""
+        for attempt in range(self.config.max_retries):
+            try:
+                return await agents_client.runs.create(
+                    thread_id=thread_id,
+                    agent_id=self.config.assistant_id
+                )
+            except AzureError as e:
+                if _is_non_retryable(e):
+                    raise
+                if attempt == self.config.max_retries - 1:
+                    raise
+                logger.warning(f"Run creation attempt {attempt + 1} failed: {e}")
+                await asyncio.sleep(self.config.retry_delay * (2 ** attempt))
+
+        raise AIFoundryWeatherAgentError("Failed to run assistant after retries")
+
+    async def _get_messages_with_retry(self, agents_client: Any, thread_id: str) -> List[Any]:
+        """Get messages with retry logic, newest first and capped server-side.
+
+        The aio SDK returns an AsyncItemPaged from messages.list — it is
+        not awaitable — so the page is drained here with async for into a
+        plain list that the shared sync parsing helpers can iterate.
+        """
+        for attempt in range(self.config.max_retries):
+            try:
+                paged = agents_client.messages.list(
+                    thread_id=thread_id,
+                    order="desc",
+                    limit=1
+                )
+                return [message async for message in paged]
+            except AzureError as e:
+                if _is_non_retryable(e):
+                    raise
+                if attempt == self.config.max_retries - 1:
+                    raise
+                logger.warning(f"Message retrieval attempt {attempt + 1} failed: {e}")
+                await asyncio.sleep(self.config.retry_delay * (2 ** attempt))
+
+        raise AIFoundryWeatherAgentError("Failed to retrieve messages after retries")
+
+    async def _wait_for_completion(self, agents_client: Any, thread_id: str, run_id: str) -> Any:
+        """Wait for the run to complete with timeout."""
+        start_time = time.time()
+
+        while True:
+            try:
+                run = await agents_client.runs.get(thread_id=thread_id, run_id=run_id)
+
+                if run.status in ['completed', 'failed', 'cancelled', 'expired']:
+                    return run
+
+                # Check timeout
+                if time.time() - start_time > self.config.timeout:
+                    error_msg = f"Assistant run timed out after {self.config.timeout} seconds"
+                    logger.error(error_msg)
+                    raise AIFoundryWeatherAgentError(error_msg, error_code="timeout")
+
+                # Yield the event loop until the next poll
+                await asyncio.sleep(self.POLL_INTERVAL)
+                logger.debug("Run status: %s", run.status)
+
+            except AzureError as e:
+                error_msg = f"Failed to get run status: {e}"
+                logger.error(error_msg)
+                raise AIFoundryWeatherAgentError(error_msg)
+
+    # Response handling is identical to the sync client; reuse its helpers.
+    _find_latest_assistant_message = AIFoundryWeatherAgentClient._find_latest_assistant_message
+    _extract_message_content = AIFoundryWeatherAgentClient._extract_message_content
+    _parse_weather_response = AIFoundryWeatherAgentClient._parse_weather_response
+
+    async def close(self) -> None:
+        """Close the underlying client and credential transports."""
+        await self.client.close()
+        await self.credential.close()
+
+    async def __aenter__(self):
+        """Async context manager entry."""
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        """Async context manager exit with proper resource cleanup."""
+        await self.close()
+        logger.debug("Async AI Foundry agent client closed successfully")
+
+
+@functools.lru_cache(maxsize=None)
+def get_shared_client(
+    endpoint: str,
+    assistant_id: str = "asst_14scpW964zK5TSFzjpdek9jG",
+    timeout: int = 60,
+    max_retries: int = 3
+) -> AIFoundryWeatherAgentClient:
+    """
+    Return a process-wide shared client for the given configuration.
+
+    Repeated calls with the same arguments return the same instance, so the
+    underlying credential, HTTP connection pool, and result cache are reused
+    across calls instead of being rebuilt per invocation.
+
+    Args:
+        endpoint: Azure AI Foundry project endpoint
+        assistant_id: Assistant ID to use (defaults to weather agent)
+        timeout: Request timeout in seconds
+        max_retries: Maximum number of retry attempts
+
+    Returns:
+        Shared AIFoundryWeatherAgentClient instance
+    """
+    config = AIFoundryConfig(
+        endpoint=endpoint,
+        assistant_id=assistant_id,
+        timeout=timeout,
+        max_retries=max_retries
+    )
+    return AIFoundryWeatherAgentClient(config)
+
+
+# Factory function for easy client creation
+def create_ai_foundry_weather_client(endpoint: str, assistant_id: str = "asst_14scpW964zK5TSFzjpdek9jG", **kwargs) -> AIFoundryWeatherAgentClient:
+    """
+    Factory function to create an AIFoundryWeatherAgentClient with default configuration.
+    
+    Args:
+        endpoint: Azure AI Foundry project endpoint
+        assistant_id: Assistant ID to use (defaults to weather agent)
+        **kwargs: Additional configuration parameters
+        
+    Returns:
+        Configured AIFoundryWeatherAgentClient instance
+    """
+    config = AIFoundryConfig(
+        endpoint=endpoint,
+        assistant_id=assistant_id,
+        **kwargs
+    )
+    return AIFoundryWeatherAgentClient(config)
@@ -14,6 +14,8 @@ Features demonstrated:
 
 import os
 import logging
+from concurrent.futures import ThreadPoolExecutor
+
 from ai_foundry_weather_client import create_ai_foundry_weather_client, AIFoundryWeatherAgentError
 
 
@@ -56,26 +58,35 @@ def main():
             print(f"Using Assistant: {assistant_id}")
             print(f"Authentication: DefaultAzureCredential")
             
-            for city in cities:
+            results = None
+            try:
+                print(f"\n🔄 Getting weather for {', '.join(cities)} in a single batch...")
+
+                # One thread/run for all cities instead of one round-trip per city
+                results = client.get_weather_batch(cities)
+
+            except AIFoundryWeatherAgentError as e:
+                print(f"❌ Batch request failed, falling back to per-city requests: {e}")
+
+                # Fallback: fetch cities concurrently so wall-clock time is
+                # bounded by the slowest request instead of their sum
                 try:
-                    print(f"\n🔄 Getting weather for {city}...")
-                    
-                    # Get weather information from Azure AI Foundry agent
-                    weather = client.get_weather(city)
-                    
-                    # Display results
-                    print(f"✅ {weather.city}:")
-                    print(f"   🌡️  Temperature: {weather.temperature}")
-                    print(f"   ☁️  Condition: {weather.condition}")
-                    print(f"   💧 Humidity: {weather.humidity}")
-                    
+                    with ThreadPoolExecutor(max_workers=min(8, len(cities))) as pool:
+                        results = list(pool.map(client.get_weather, cities))
                 except AIFoundryWeatherAgentError as e:
-                    print(f"❌ Error getting weather for {city}: {e}")
+                    print(f"❌ Error getting weather: {e}")
                     if e.error_code:
                         print(f"   Error code: {e.error_code}")
-                    
                 except Exception as e:
-                    print(f"❌ Unexpected error for {city}: {e}")
+                    print(f"❌ Unexpected error: {e}")
+
+            # Display results serially once all requests are done
+            if results:
+                for weather in results:
+                    print(f"\n✅ {weather.city}:")
+                    print(f"   🌡️  Temperature: {weather.temperature}")
+                    print(f"   ☁️  Condition: {weather.condition}")
+                    print(f"   💧 Humidity: {weather.humidity}")
                     
             print(f"\n✨ Azure AI Foundry example completed!")
             
@@ -1,448 +1,610 @@
-#!/usr/bin/env python3
-"""
-Azure AI Foundry Weather Agent CLI Application
-
-A command-line interface for interacting with the Weather Agent using
-Azure AI Foundry SDK with best practices including:
-- DefaultAzureCredential for secure authentication
-- Azure AI Foundry project endpoint
-- Proper error handling and retry logic
-- Comprehensive logging
-
-Usage:
-    python main.py [OPTIONS] CITY
-
-Examples:
-    python main.py weather Milan
-    python main.py weather "New York" --verbose
-    python main.py weather London --timeout 120
-"""
-
-import os
-import sys
-import logging
-
-import click
-from dotenv import load_dotenv
-
-from ai_foundry_weather_client import (
-    AIFoundryWeatherAgentClient,
-    AIFoundryConfig,
-    AIFoundryWeatherAgentError,
-    create_ai_foundry_weather_client
-)
-
-
-# Load environment variables
-load_dotenv()
-
-
-def setup_logging(verbose: bool) -> None:
-    """
-    Configure logging based on verbosity level.
-    
-    Args:
-        verbose: Whether to enable verbose logging
-    """
-    level = logging.DEBUG if verbose else logging.INFO
-    logging.basicConfig(
-        level=level,
-        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-        force=True  # Override existing configuration
-    )
-
-
-def get_project_endpoint() -> str:
-    """
-    Get the Azure AI Foundry project endpoint from environment variables.
-    
-    Returns:
-        Project endpoint URL
-        
-    Raises:
-        SystemExit: If endpoint is not configured
-    """
-    endpoint = os.getenv("AZURE_AI_PROJECT_ENDPOINT")
-    if not endpoint or endpoint == "https://your-ai-project.cognitiveservices.azure.com/":
-        click.echo("❌ Azure AI Foundry project endpoint not configured!", err=True)
-        click.echo("Please set AZURE_AI_PROJECT_ENDPOINT in your .env file", err=True)
-        click.echo("\nExample:", err=True)
-        click.echo("AZURE_AI_PROJECT_ENDPOINT=https://your-ai-project.cognitiveservices.azure.com/", err=True)
-        sys.exit(1)
-    
-    return endpoint
-
-
-def get_assistant_id() -> str:
-    """
-    Get the assistant ID from environment variables.
-    
-    Returns:
-        Assistant ID string
-    """
-    return os.getenv("ASSISTANT_ID", "asst_14scpW964zK5TSFzjpdek9jG")
-
-
-def format_weather_output(weather_data, city_input: str) -> str:
-    """
-    Format weather data for display.
-    
-    Args:
-        weather_data: Weather result from the AI agent
-        city_input: Original city input from user
-        
-    Returns:
-        Formatted weather information string
-    """
-    return f"""
-🌤️  Weather Information for {weather_data.city}
-{'=' * (25 + len(weather_data.city))}
-
-🌡️  Temperature: {weather_data.temperature}
-☁️  Condition:   {weather_data.condition}
-💧 Humidity:    {weather_data.humidity}
-
-Requested city: {city_input}
-Resolved city:  {weather_data.city}
-"""
-
-
-@click.group()
-def cli():
-    """Azure AI Foundry Weather Agent CLI Application."""
-    pass
-
-
-@cli.command()
-@click.argument('city', type=str)
-@click.option(
-    '--timeout',
-    type=int,
-    default=None,
-    help='Request timeout in seconds (default from env or 60s)'
-)
-@click.option(
-    '--retries',
-    type=int,
-    default=None,
-    help='Maximum number of retry attempts (default from env or 3)'
-)
-@click.option(
-    '--verbose',
-    is_flag=True,
-    help='Enable verbose logging'
-)
-@click.option(
-    '--raw',
-    is_flag=True,
-    help='Output raw JSON response'
-)
-def weather(
-    city: str,
-    timeout: int,
-    retries: int,
-    verbose: bool,
-    raw: bool
-) -> None:
-    """
-    Get weather information for a specified CITY using Azure AI Foundry.
-    
-    This command connects to Azure AI Foundry and uses the weather agent
-    to retrieve current weather conditions for the specified city.
-    
-    CITY: Name of the city to get weather information for
-    """
-    # Setup logging
-    setup_logging(verbose)
-    logger = logging.getLogger(__name__)
-    
-    try:
-        # Get configuration
-        endpoint = get_project_endpoint()
-        assistant_id = get_assistant_id()
-        
-        # Use environment defaults if not specified
-        if timeout is None:
-            timeout = int(os.getenv("REQUEST_TIMEOUT", "60"))
-        if retries is None:
-            retries = int(os.getenv("MAX_RETRIES", "3"))
-        
-        logger.info(f"Using Azure AI Foundry assistant: {assistant_id}")
-        logger.debug(f"Configuration: timeout={timeout}s, retries={retries}")
-        
-        # Create AI Foundry client configuration
-        config = AIFoundryConfig(
-            endpoint=endpoint,
-            assistant_id=assistant_id,
-            timeout=timeout,
-            max_retries=retries
-        )
-        
-        # Use context manager for proper resource cleanup
-        with AIFoundryWeatherAgentClient(config) as client:
-            click.echo(f"🤖 Getting weather for {city} using Azure AI Foundry...")
-            
-            # Get weather information
-            weather_data = client.get_weather(city=city)
-            
-            if raw:
-                # Output raw data as JSON
-                import json
-                raw_data = {
-                    "city": weather_data.city,
-                    "temperature": weather_data.temperature,
-                    "condition": weather_data.condition,
-                    "humidity": weather_data.humidity,
-                    "source": "azure_ai_foundry",
-                    "assistant_id": assistant_id
-                }
-                click.echo(json.dumps(raw_data, indent=2))
-            else:
-                # Output formatted weather information
-                formatted_output = format_weather_output(weather_data, city)
-                click.echo(formatted_output + f"\n🤖 Source: Azure AI Foundry Agent ({assistant_id})")
-            
-            logger.info("Weather information retrieved successfully from Azure AI Foundry")
-            
-    except AIFoundryWeatherAgentError as e:
-        error_msg = f"AI Foundry Agent Error: {e}"
-        if e.error_code:
-            error_msg += f" (Code: {e.error_code})"
-        
-        logger.error(error_msg)
-        click.echo(f"❌ {error_msg}", err=True)
-        
-        if verbose and e.response_data:
-            click.echo(f"Response data: {e.response_data}", err=True)
-        
-        sys.exit(1)
-        
-    except Exception as e:
-        error_msg = f"Unexpected error: {e}"
-        logger.error(error_msg, exc_info=True)
-        click.echo(f"❌ {error_msg}", err=True)
-        sys.exit(1)
-
-
-@click.group()
-@click.version_option(version="2.0.0", prog_name="Azure AI Foundry Weather CLI")
-def cli():
-    """
-    Azure AI Foundry Weather Agent CLI Application
-    
-    A command-line interface for retrieving weather information using
-    Azure AI Foundry and the Weather Agent described in Agent214.agent.yaml.
-    
-    Features:
-    - Secure authentication with DefaultAzureCredential
-    - Supports Managed Identity, Service Principal, and Interactive auth
-    - Comprehensive error handling and retry logic
-    - Performance optimizations and resource cleanup
-    """
-    pass
-
-
-@cli.command()
-def config():
-    """Show current configuration and authentication status."""
-    endpoint = os.getenv("AZURE_AI_PROJECT_ENDPOINT", "NOT SET")
-    assistant_id = get_assistant_id()
-    timeout = int(os.getenv("REQUEST_TIMEOUT", "60"))
-    max_retries = int(os.getenv("MAX_RETRIES", "3"))
-    log_level = os.getenv("LOG_LEVEL", "INFO")
-    
-    click.echo("🔧 Azure AI Foundry Configuration:")
-    click.echo(f"   Project Endpoint:   {'***configured***' if endpoint != 'NOT SET' and endpoint != 'https://your-ai-project.cognitiveservices.azure.com/' else '❌ NOT SET'}")
-    click.echo(f"   Assistant ID:       {assistant_id}")
-    click.echo(f"   Timeout:           {timeout}s")
-    click.echo(f"   Max Retries:       {max_retries}")
-    click.echo(f"   Log Level:         {log_level}")
-    
-    # Test authentication
-    click.echo("\n🔐 Authentication Test:")
-    try:
-        from azure.identity import DefaultAzureCredential
-        credential = DefaultAzureCredential()
-        click.echo("   ✅ DefaultAzureCredential initialized")
-        
-        # Try to get a token (this will test if authentication works)
-        try:
-            token = credential.get_token("https://management.azure.com/.default")
-            click.echo("   ✅ Authentication successful")
-        except Exception as e:
-            click.echo(f"   ⚠️  Authentication may have issues: {e}")
-            
-    except ImportError:
-        click.echo("   ❌ Azure Identity SDK not available")
-    except Exception as e:
-        click.echo(f"   ❌ Authentication error: {e}")
-
-
-@cli.command()
-@click.argument('cities', nargs=-1, required=True)
-@click.option('--timeout', type=int, default=None, help='Request timeout in seconds')
-@click.option('--retries', type=int, default=None, help='Maximum retry attempts')
-@click.option('--verbose', is_flag=True, help='Enable verbose logging')
-def batch(cities, timeout: int, retries: int, verbose: bool):
-    """
-    Get weather information for multiple cities.
-    
-    CITIES: Space-separated list of city names
-    """
-    setup_logging(verbose)
-    logger = logging.getLogger(__name__)
-    
-    try:
-        endpoint = get_project_endpoint()
-        assistant_id = get_assistant_id()
-        
-        # Use environment defaults if not specified
-        if timeout is None:
-            timeout = int(os.getenv("REQUEST_TIMEOUT", "60"))
-        if retries is None:
-            retries = int(os.getenv("MAX_RETRIES", "3"))
-        
-        config = AIFoundryConfig(
-            endpoint=endpoint,
-            assistant_id=assistant_id,
-            timeout=timeout,
-            max_retries=retries
-        )
-        
-        results = []
-        errors = []
-        
-        with AIFoundryWeatherAgentClient(config) as client:
-            for city in cities:
-                try:
-                    click.echo(f"🔄 Fetching weather for {city}...")
-                    weather_data = client.get_weather(city=city)
-                    results.append((city, weather_data))
-                    click.echo(f"✅ {city}: {weather_data.temperature}, {weather_data.condition}")
-                    
-                except AIFoundryWeatherAgentError as e:
-                    error_msg = f"{city}: {e}"
-                    errors.append(error_msg)
-                    click.echo(f"❌ {error_msg}", err=True)
-        
-        # Summary
-        click.echo(f"\n📊 Summary: {len(results)} successful, {len(errors)} failed")
-        
-        if errors and verbose:
-            click.echo("\n❌ Errors:")
-            for error in errors:
-                click.echo(f"   {error}")
-                
-    except Exception as e:
-        logger.error(f"Batch operation failed: {e}")
-        click.echo(f"❌ Batch operation failed: {e}", err=True)
-        sys.exit(1)
-
-
-@cli.command()
-def test():
-    """Test the AI Foundry connection and authentication."""
-    setup_logging(True)  # Enable verbose logging for test
-    logger = logging.getLogger(__name__)
-    
-    click.echo("🧪 Testing Azure AI Foundry Connection...")
-    
-    try:
-        # Test configuration
-        endpoint = get_project_endpoint()
-        assistant_id = get_assistant_id()
-        
-        click.echo(f"✅ Configuration loaded")
-        click.echo(f"   Assistant ID: {assistant_id}")
-        
-        # Test authentication
-        from azure.identity import DefaultAzureCredential
-        credential = DefaultAzureCredential()
-        click.echo("✅ DefaultAzureCredential initialized")
-        
-        # Test AI Foundry client creation
-        config = AIFoundryConfig(
-            endpoint=endpoint,
-            assistant_id=assistant_id,
-            timeout=30,
-            max_retries=1
-        )
-        
-        with AIFoundryWeatherAgentClient(config) as client:
-            click.echo("✅ AI Foundry client created successfully")
-            
-            # Test with a simple city
-            test_city = "Milan"
-            click.echo(f"🔄 Testing weather request for {test_city}...")
-            
-            weather_data = client.get_weather(test_city)
-            click.echo(f"✅ Test successful!")
-            click.echo(f"   City: {weather_data.city}")
-            click.echo(f"   Temperature: {weather_data.temperature}")
-            click.echo(f"   Condition: {weather_data.condition}")
-            click.echo(f"   Humidity: {weather_data.humidity}")
-            
-    except Exception as e:
-        logger.error(f"Test failed: {e}", exc_info=True)
-        click.echo(f"❌ Test failed: {e}", err=True)
-        sys.exit(1)
-
-
-@cli.command()
-@click.option('--verbose', is_flag=True, help='Enable verbose logging')
-def diagnose(verbose: bool):
-    """Diagnose agent configuration and connectivity."""
-    setup_logging(verbose)
-    
-    try:
-        endpoint = get_project_endpoint()
-        assistant_id = get_assistant_id()
-        
-        config = AIFoundryConfig(
-            endpoint=endpoint,
-            assistant_id=assistant_id
-        )
-        
-        click.echo("🔍 Diagnosing Azure AI Foundry Agent...")
-        
-        with AIFoundryWeatherAgentClient(config) as client:
-            diagnostics = client.diagnose_agent()
-            
-            click.echo("\n📋 Diagnostic Results:")
-            click.echo(f"   Agent ID:      {diagnostics['agent_id']}")
-            click.echo(f"   Endpoint:      {diagnostics['endpoint']}")
-            click.echo(f"   Agent Exists:  {'✅ Yes' if diagnostics['agent_exists'] else '❌ No'}")
-            
-            if diagnostics.get('error'):
-                click.echo(f"   ❌ Error:      {diagnostics['error']}")
-            
-            if diagnostics.get('agent_details'):
-                details = diagnostics['agent_details']
-                click.echo("\n🤖 Agent Details:")
-                click.echo(f"   Name:         {details.get('name', 'Unknown')}")
-                click.echo(f"   Description:  {details.get('description', 'Unknown')}")
-                click.echo(f"   Model:        {details.get('model', 'Unknown')}")
-                click.echo(f"   Tools:        {len(details.get('tools', []))} tools configured")
-                
-                if verbose and details.get('tools'):
-                    click.echo("\n🔧 Tools:")
-                    for i, tool in enumerate(details['tools'], 1):
-                        tool_type = tool.get('type', 'unknown') if isinstance(tool, dict) else str(tool)
-                        click.echo(f"     {i}. {tool_type}")
-        
-    except Exception as e:
-        click.echo(f"❌ Diagnostic failed: {e}")
-        if verbose:
-            import traceback
-            click.echo(f"\nFull error:\n{traceback.format_exc()}")
-
-
-# Add the commands to the CLI group
-cli.add_command(weather)
-cli.add_command(config)
-cli.add_command(batch)
-cli.add_command(diagnose)
-
-
-if __name__ == '__main__':
-    cli()
+#!/usr/bin/env python3
+"""
+Azure AI Foundry Weather Agent CLI Application
+
+A command-line interface for interacting with the Weather Agent using
+Azure AI Foundry SDK with best practices including:
+- DefaultAzureCredential for secure authentication
+- Azure AI Foundry project endpoint
+- Proper error handling and retry logic
+- Comprehensive logging
+
+Usage:
+    python main.py [OPTIONS] CITY
+
+Examples:
+    python main.py weather Milan
+    python main.py weather "New York" --verbose
+    python main.py weather London --timeout 120
+"""
+
+import functools
+import os
+import sys
+import time
+import logging
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+import click
+from dotenv import load_dotenv
+
+# NOTE: ai_foundry_weather_client (and through it azure.identity,
+# azure.ai.projects and pydantic) is imported lazily inside the commands
+# that need it, so `--help`, `--version` and `config` start without
+# paying the full SDK import cost.
+
+
+# Load environment variables
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+
+def setup_logging(verbose: bool) -> None:
+    """
+    Configure logging based on verbosity level.
+    
+    Args:
+        verbose: Whether to enable verbose logging
+    """
+    level = logging.DEBUG if verbose else logging.INFO
+    logging.basicConfig(
+        level=level,
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+        force=True  # Override existing configuration
+    )
+
+
+# Tokens acquired by the auth probe, keyed by scope so repeated probes in
+# one process reuse them instead of paying another IMDS/AAD round-trip
+_PROBE_TOKENS = {}
+
+
+def _probe_token(credential, scope: str):
+    """Return a live access token for scope, reusing the cached one when fresh.
+
+    The cache is per scope — a token issued for one resource must never be
+    served for another. A token is considered fresh until five minutes
+    before its expiry, the same margin the SDK pipeline uses.
+    """
+    token = _PROBE_TOKENS.get(scope)
+    if token is not None and token.expires_on - time.time() > 300:
+        return token
+    token = credential.get_token(scope)
+    _PROBE_TOKENS[scope] = token
+    return token
+
+
+# Placeholder values that mean "no endpoint configured"; a set membership
+# test replaces the inline string-compare chain wherever this is checked
+_SENTINEL_ENDPOINTS = frozenset({
+    "NOT SET",
+    "https://your-ai-project.cognitiveservices.azure.com/",
+})
+
+
+def _endpoint_is_configured(endpoint) -> bool:
+    """True when the endpoint is set and not a placeholder value."""
+    return bool(endpoint) and endpoint not in _SENTINEL_ENDPOINTS
+
+
+@functools.lru_cache(maxsize=1)
+def get_project_endpoint() -> str:
+    """
+    Get the Azure AI Foundry project endpoint from environment variables.
+
+    Cached so repeated commands in one process read os.environ once.
+    
+    Returns:
+        Project endpoint URL
+        
+    Raises:
+        SystemExit: If endpoint is not configured
+    """
+    endpoint = os.getenv("AZURE_AI_PROJECT_ENDPOINT")
+    if not _endpoint_is_configured(endpoint):
+        click.echo("❌ Azure AI Foundry project endpoint not configured!", err=True)
+        click.echo("Please set AZURE_AI_PROJECT_ENDPOINT in your .env file", err=True)
+        click.echo("\nExample:", err=True)
+        click.echo("AZURE_AI_PROJECT_ENDPOINT=https://your-ai-project.cognitiveservices.azure.com/", err=True)
+        sys.exit(1)
+    
+    return endpoint
+
+
+@functools.lru_cache(maxsize=1)
+def get_assistant_id() -> str:
+    """
+    Get the assistant ID from environment variables.
+    
+    Returns:
+        Assistant ID string
+    """
+    return os.getenv("ASSISTANT_ID", "asst_14scpW964zK5TSFzjpdek9jG")
+
+
+# Parsed-once environment defaults; these are read by several subcommands,
+# so the str->int conversion and environ lookup happen a single time
+@functools.lru_cache(maxsize=1)
+def _cfg_timeout() -> int:
+    return int(os.getenv("REQUEST_TIMEOUT", "60"))
+
+
+@functools.lru_cache(maxsize=1)
+def _cfg_max_retries() -> int:
+    return int(os.getenv("MAX_RETRIES", "3"))
+
+
+@functools.lru_cache(maxsize=1)
+def _cfg_log_level() -> str:
+    return os.getenv("LOG_LEVEL", "INFO")
+
+
+def format_weather_output(weather_data, city_input: str) -> str:
+    """
+    Format weather data for display.
+    
+    Args:
+        weather_data: Weather result from the AI agent
+        city_input: Original city input from user
+        
+    Returns:
+        Formatted weather information string
+    """
+    return f"""
+🌤️  Weather Information for {weather_data.city}
+{'=' * (25 + len(weather_data.city))}
+
+🌡️  Temperature: {weather_data.temperature}
+☁️  Condition:   {weather_data.condition}
+💧 Humidity:    {weather_data.humidity}
+
+Requested city: {city_input}
+Resolved city:  {weather_data.city}
+"""
+
+
+@click.group()
+@click.version_option(version="2.0.0", prog_name="Azure AI Foundry Weather CLI")
+@click.option('--verbose', is_flag=True, help='Enable verbose logging for all commands')
+@click.pass_context
+def cli(ctx, verbose: bool):
+    """
+    Azure AI Foundry Weather Agent CLI Application
+
+    A command-line interface for retrieving weather information using
+    Azure AI Foundry and the Weather Agent described in Agent214.agent.yaml.
+
+    Features:
+    - Secure authentication with DefaultAzureCredential
+    - Supports Managed Identity, Service Principal, and Interactive auth
+    - Comprehensive error handling and retry logic
+    - Performance optimizations and resource cleanup
+    """
+    # Configure logging exactly once per invocation, here in the group
+    # callback, instead of per command entry point
+    ctx.obj = {'verbose': verbose}
+    setup_logging(verbose)
+
+
+@cli.command()
+@click.argument('cities', nargs=-1, required=True)
+@click.option(
+    '--timeout',
+    type=int,
+    default=None,
+    help='Request timeout in seconds (default from env or 60s)'
+)
+@click.option(
+    '--retries',
+    type=int,
+    default=None,
+    help='Maximum number of retry attempts (default from env or 3)'
+)
+@click.option(
+    '--verbose',
+    is_flag=True,
+    help='Enable verbose logging'
+)
+@click.option(
+    '--raw',
+    is_flag=True,
+    help='Output raw JSON response'
+)
+def weather(
+    cities,
+    timeout: int,
+    retries: int,
+    verbose: bool,
+    raw: bool
+) -> None:
+    """
+    Get weather information for one or more CITIES using Azure AI Foundry.
+
+    This command connects to Azure AI Foundry and uses the weather agent
+    to retrieve current weather conditions. When several cities are given,
+    they are sent to the agent in a single batched request.
+
+    CITIES: One or more city names to get weather information for
+    """
+    # The group callback configures logging once; the local flag still
+    # escalates this run to DEBUG (and keeps the detailed error output)
+    if verbose:
+        setup_logging(True)
+
+    from ai_foundry_weather_client import AIFoundryWeatherAgentError, get_shared_client
+
+    try:
+        # Get configuration
+        endpoint = get_project_endpoint()
+        assistant_id = get_assistant_id()
+        
+        # Use environment defaults if not specified
+        if timeout is None:
+            timeout = _cfg_timeout()
+        if retries is None:
+            retries = _cfg_max_retries()
+        
+        logger.info(f"Using Azure AI Foundry assistant: {assistant_id}")
+        logger.debug(f"Configuration: timeout={timeout}s, retries={retries}")
+        
+        # Reuse a process-wide client so repeated calls share the credential
+        # and HTTP connection pool instead of re-handshaking per invocation
+        client = get_shared_client(endpoint, assistant_id, timeout=timeout, max_retries=retries)
+
+        if len(cities) == 1:
+            click.echo(f"🤖 Getting weather for {cities[0]} using Azure AI Foundry...")
+            results = [client.get_weather(city=cities[0])]
+        else:
+            click.echo(f"🤖 Getting weather for {len(cities)} cities using Azure AI Foundry (single batch)...")
+            # One thread/run for all cities instead of one round-trip per city
+            results = client.get_weather_batch(list(cities))
+
+        if raw:
+            # Output raw data as JSON
+            import json
+            raw_data = [
+                {
+                    "city": weather_data.city,
+                    "temperature": weather_data.temperature,
+                    "condition": weather_data.condition,
+                    "humidity": weather_data.humidity,
+                    "source": "azure_ai_foundry",
+                    "assistant_id": assistant_id
+                }
+                for weather_data in results
+            ]
+            click.echo(json.dumps(raw_data[0] if len(raw_data) == 1 else raw_data, indent=2))
+        else:
+            # Output formatted weather information
+            for city_input, weather_data in zip(cities, results):
+                formatted_output = format_weather_output(weather_data, city_input)
+                click.echo(formatted_output + f"\n🤖 Source: Azure AI Foundry Agent ({assistant_id})")
+
+        logger.info("Weather information retrieved successfully from Azure AI Foundry")
+            
+    except AIFoundryWeatherAgentError as e:
+        error_msg = f"AI Foundry Agent Error: {e}"
+        if e.error_code:
+            error_msg += f" (Code: {e.error_code})"
+        
+        logger.error(error_msg)
+        click.echo(f"❌ {error_msg}", err=True)
+        
+        if verbose and e.response_data:
+            click.echo(f"Response data: {e.response_data}", err=True)
+        
+        sys.exit(1)
+        
+    except Exception as e:
+        error_msg = f"Unexpected error: {e}"
+        logger.error(error_msg, exc_info=True)
+        click.echo(f"❌ {error_msg}", err=True)
+        sys.exit(1)
+
+
+def _print_config_summary() -> None:
+    """Print the env-derived configuration block (no network, no SDK)."""
+    endpoint = os.getenv("AZURE_AI_PROJECT_ENDPOINT", "NOT SET")
+    assistant_id = get_assistant_id()
+    timeout = _cfg_timeout()
+    max_retries = _cfg_max_retries()
+    log_level = _cfg_log_level()
+
+    click.echo("🔧 Azure AI Foundry Configuration:")
+    click.echo(f"   Project Endpoint:   {'***configured***' if _endpoint_is_configured(endpoint) else '❌ NOT SET'}")
+    click.echo(f"   Assistant ID:       {assistant_id}")
+    click.echo(f"   Timeout:           {timeout}s")
+    click.echo(f"   Max Retries:       {max_retries}")
+    click.echo(f"   Log Level:         {log_level}")
+
+
+@cli.command()
+@click.option('--test-auth', is_flag=True, help='Probe credential acquisition (may trigger interactive auth)')
+def config(test_auth: bool):
+    """Show current configuration and authentication status."""
+    _print_config_summary()
+
+    if not test_auth:
+        click.echo("\n🔐 Authentication test skipped (pass --test-auth to probe credentials)")
+        return
+
+    # Test authentication
+    click.echo("\n🔐 Authentication Test:")
+    try:
+        # Reuse the client module's process-wide credential so repeated
+        # subcommands share one credential chain and its token cache
+        from ai_foundry_weather_client import _get_shared_credential
+        credential = _get_shared_credential()
+        click.echo("   ✅ Credential initialized")
+
+        # Try to get a token — same scope the AI Foundry client uses, so
+        # the cached token is reused by the first real request instead of
+        # minting a second one for ARM; repeated probes in one process
+        # short-circuit on the cached token while it is still live
+        try:
+            token = _probe_token(credential, "https://ai.azure.com/.default")
+            click.echo("   ✅ Authentication successful")
+        except Exception as e:
+            click.echo(f"   ⚠️  Authentication may have issues: {e}")
+
+    except ImportError:
+        click.echo("   ❌ Azure Identity SDK not available")
+    except Exception as e:
+        click.echo(f"   ❌ Authentication error: {e}")
+
+
+@cli.command()
+@click.argument('cities', nargs=-1, required=True)
+@click.option('--timeout', type=int, default=None, help='Request timeout in seconds')
+@click.option('--retries', type=int, default=None, help='Maximum retry attempts')
+@click.option('--verbose', is_flag=True, help='Enable verbose logging')
+@click.option('--workers', type=int, default=None, help='Concurrent requests (default min(10, number of cities))')
+@click.option('--json', 'as_json', is_flag=True, help='Emit one JSON array instead of per-city progress')
+def batch(cities, timeout: int, retries: int, verbose: bool, workers: int, as_json: bool):
+    """
+    Get weather information for multiple cities.
+
+    CITIES: Space-separated list of city names
+    """
+    # Escalate to DEBUG for this run when the local flag is set; the
+    # group-level --verbose already did so globally
+    if verbose:
+        setup_logging(True)
+
+    from ai_foundry_weather_client import (
+        AIFoundryWeatherAgentError,
+        _get_shared_session,
+        get_shared_client,
+    )
+
+    try:
+        endpoint = get_project_endpoint()
+        assistant_id = get_assistant_id()
+
+        # Use environment defaults if not specified
+        if timeout is None:
+            timeout = _cfg_timeout()
+        if retries is None:
+            retries = _cfg_max_retries()
+
+        if workers is None:
+            workers = min(10, len(cities))
+
+        # Size the shared connection pool for the fan-out before the client
+        # first touches it, so concurrent requests don't queue behind the
+        # adapter's default per-host limit; the process-wide client then
+        # keeps those connections warm across invocations in one process
+        _get_shared_session(pool_maxsize=max(20, len(cities)))
+        client = get_shared_client(endpoint, assistant_id, timeout=timeout, max_retries=retries)
+
+        # Stream results as they arrive: only counters are kept, so memory
+        # stays constant regardless of city count and the TTY gets feedback
+        # per city instead of one buffered summary at the end. Under --json
+        # the per-city echoes are suppressed and results are buffered into
+        # one machine-readable array for the consuming process.
+        n_ok = 0
+        n_err = 0
+        errors = [] if verbose else None  # full messages only kept for the verbose recap
+        json_out = [] if as_json else None
+
+        def record(city, weather_data=None, error=None):
+            nonlocal n_ok, n_err
+            if error is None:
+                n_ok += 1
+                if json_out is not None:
+                    json_out.append({
+                        "city": weather_data.city,
+                        "temperature": weather_data.temperature,
+                        "condition": weather_data.condition,
+                        "humidity": weather_data.humidity,
+                        "error": None,
+                    })
+                else:
+                    click.echo(f"✅ {city}: {weather_data.temperature}, {weather_data.condition}")
+            else:
+                n_err += 1
+                if json_out is not None:
+                    json_out.append({"city": city, "error": str(error)})
+                else:
+                    error_msg = f"{city}: {error}"
+                    if errors is not None:
+                        errors.append(error_msg)
+                    click.echo(f"❌ {error_msg}", err=True)
+
+        if len(cities) > 1:
+            # Preferred path: one agent thread+run for every city, which
+            # amortizes thread creation and run polling across the batch
+            # instead of paying them N times
+            try:
+                if not as_json:
+                    click.echo(f"🔄 Fetching weather for {len(cities)} cities in a single agent run...")
+                for city, weather_data in zip(cities, client.get_weather_batch(list(cities))):
+                    record(city, weather_data)
+            except AIFoundryWeatherAgentError as e:
+                logger.warning(f"Bulk request failed, falling back to per-city requests: {e}")
+                n_ok = 0
+                if json_out is not None:
+                    json_out.clear()
+
+        if n_ok == 0:
+            # Fallback (and single-city path): fan the cities out over a
+            # thread pool so wall time is bounded by the slowest request
+            if not as_json:
+                click.echo(f"🔄 Fetching weather for {len(cities)} cities ({workers} workers)...")
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                futures = {executor.submit(client.get_weather, city): city for city in cities}
+
+                # Stream progress as each city finishes rather than in submit order
+                for future in as_completed(futures):
+                    city = futures[future]
+                    try:
+                        record(city, future.result())
+                    except AIFoundryWeatherAgentError as e:
+                        record(city, error=e)
+
+        if as_json:
+            # One compact dump, one write — downstream gets a single
+            # json.load instead of re-parsing formatted lines
+            import json
+            click.echo(json.dumps(json_out, separators=(",", ":")))
+            if n_err:
+                sys.exit(1)
+            return
+
+        # Summary
+        click.echo(f"\n📊 Summary: {n_ok} successful, {n_err} failed")
+
+        if errors:
+            click.echo("\n❌ Errors:")
+            for error in errors:
+                click.echo(f"   {error}")
+                
+    except Exception as e:
+        logger.error(f"Batch operation failed: {e}")
+        click.echo(f"❌ Batch operation failed: {e}", err=True)
+        sys.exit(1)
+
+
+@cli.command()
+def test():
+    """Test the AI Foundry connection and authentication."""
+    click.echo("🧪 Testing Azure AI Foundry Connection...")
+
+    from ai_foundry_weather_client import AIFoundryWeatherAgentClient, AIFoundryConfig
+
+    try:
+        # Test configuration
+        endpoint = get_project_endpoint()
+        assistant_id = get_assistant_id()
+        
+        click.echo(f"✅ Configuration loaded")
+        click.echo(f"   Assistant ID: {assistant_id}")
+        
+        # Test authentication (shared credential, see config command)
+        from ai_foundry_weather_client import _get_shared_credential
+        credential = _get_shared_credential()
+        click.echo("✅ Credential initialized")
+        
+        # Test AI Foundry client creation
+        config = AIFoundryConfig(
+            endpoint=endpoint,
+            assistant_id=assistant_id,
+            timeout=30,
+            max_retries=1
+        )
+        
+        with AIFoundryWeatherAgentClient(config) as client:
+            click.echo("✅ AI Foundry client created successfully")
+            
+            # Test with a simple city
+            test_city = "Milan"
+            click.echo(f"🔄 Testing weather request for {test_city}...")
+            
+            weather_data = client.get_weather(test_city)
+            click.echo(f"✅ Test successful!")
+            click.echo(f"   City: {weather_data.city}")
+            click.echo(f"   Temperature: {weather_data.temperature}")
+            click.echo(f"   Condition: {weather_data.condition}")
+            click.echo(f"   Humidity: {weather_data.humidity}")
+            
+    except Exception as e:
+        logger.error(f"Test failed: {e}", exc_info=True)
+        click.echo(f"❌ Test failed: {e}", err=True)
+        sys.exit(1)
+
+
+@cli.command()
+@click.option('--verbose', is_flag=True, help='Enable verbose logging')
+def diagnose(verbose: bool):
+    """Diagnose agent configuration and connectivity."""
+    if verbose:
+        setup_logging(True)
+
+    from ai_foundry_weather_client import AIFoundryWeatherAgentClient, AIFoundryConfig
+
+    try:
+        endpoint = get_project_endpoint()
+        assistant_id = get_assistant_id()
+        
+        config = AIFoundryConfig(
+            endpoint=endpoint,
+            assistant_id=assistant_id
+        )
+        
+        click.echo("🔍 Diagnosing Azure AI Foundry Agent...")
+        
+        with AIFoundryWeatherAgentClient(config) as client:
+            diagnostics = client.diagnose_agent()
+
+            # Build the whole report, then emit it with one echo: a single
+            # write instead of one per line (stdout is block-buffered when
+            # piped, so this also plays nicer with CI log scraping)
+            lines = [
+                "\n📋 Diagnostic Results:",
+                f"   Agent ID:      {diagnostics['agent_id']}",
+                f"   Endpoint:      {diagnostics['endpoint']}",
+                f"   Agent Exists:  {'✅ Yes' if diagnostics['agent_exists'] else '❌ No'}",
+            ]
+
+            if diagnostics.get('error'):
+                lines.append(f"   ❌ Error:      {diagnostics['error']}")
+
+            details = diagnostics.get('agent_details')
+            if details:
+                tools = details.get('tools', [])
+                lines += [
+                    "\n🤖 Agent Details:",
+                    f"   Name:         {details.get('name', 'Unknown')}",
+                    f"   Description:  {details.get('description', 'Unknown')}",
+                    f"   Model:        {details.get('model', 'Unknown')}",
+                    f"   Tools:        {len(tools)} tools configured",
+                ]
+
+                if verbose and tools:
+                    lines.append("\n🔧 Tools:")
+                    for i, tool in enumerate(tools, 1):
+                        tool_type = tool.get('type', 'unknown') if isinstance(tool, dict) else str(tool)
+                        lines.append(f"     {i}. {tool_type}")
+
+            click.echo("\n".join(lines))
+        
+    except Exception as e:
+        click.echo(f"❌ Diagnostic failed: {e}")
+        if verbose:
+            import traceback
+            click.echo(f"\nFull error:\n{traceback.format_exc()}")
+
+
+if __name__ == '__main__':
+    # Fast path for the most common no-op inspections: handle them without
+    # building Click's command tree. Not comprehensive — anything with
+    # extra flags falls through to the full parser.
+    if len(sys.argv) == 2 and sys.argv[1] == '--version':
+        print("Azure AI Foundry Weather CLI 2.0.0")
+        sys.exit(0)
+    if len(sys.argv) == 2 and sys.argv[1] == 'config':
+        _print_config_summary()
+        click.echo("\n🔐 Authentication test skipped (pass --test-auth to probe credentials)")
+        sys.exit(0)
+    cli()
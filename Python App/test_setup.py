@@ -1,207 +1,279 @@
-#!/usr/bin/env python3
-"""
-Test script to verify the Weather Agent Python App installation and basic functionality.
-
-This script performs basic tests to ensure the application is properly configured
-and can interact with the Weather Agent API.
-"""
-
-import sys
-import os
-import importlib.util
-from pathlib import Path
-
-
-def check_python_version():
-    """Check if Python version is compatible."""
-    print("🔍 Checking Python version...")
-    
-    if sys.version_info < (3, 7):
-        print("❌ Python 3.7 or higher is required")
-        return False
-    
-    print(f"✅ Python {sys.version.split()[0]} is compatible")
-    return True
-
-
-def check_dependencies():
-    """Check if required dependencies are installed."""
-    print("\n🔍 Checking dependencies...")
-    
-    required_packages = [
-        ('azure-ai-projects', 'azure.ai.projects'),
-        ('azure-identity', 'azure.identity'),
-        ('click', 'click'),
-        ('pydantic', 'pydantic'),
-        ('python-dotenv', 'dotenv')
-    ]
-    
-    missing_packages = []
-    
-    for package_name, import_name in required_packages:
-        try:
-            __import__(import_name)
-            print(f"✅ {package_name} is installed")
-        except ImportError:
-            print(f"❌ {package_name} is missing")
-            missing_packages.append(package_name)
-    
-    if missing_packages:
-        print(f"\n📦 To install missing packages, run:")
-        print(f"pip install {' '.join(missing_packages)}")
-        return False
-    
-    return True
-
-
-def check_files():
-    """Check if required files exist."""
-    print("\n🔍 Checking project files...")
-    
-    required_files = [
-        'main.py',
-        'ai_foundry_weather_client.py',
-        'example.py',
-        'requirements.txt',
-        'README.md'
-    ]
-    
-    missing_files = []
-    
-    for file in required_files:
-        if os.path.exists(file):
-            print(f"✅ {file} exists")
-        else:
-            print(f"❌ {file} is missing")
-            missing_files.append(file)
-    
-    return len(missing_files) == 0
-
-
-def test_import():
-    """Test importing the AI Foundry weather client module."""
-    print("\n🔍 Testing module imports...")
-    
-    try:
-        from ai_foundry_weather_client import (
-            AIFoundryWeatherAgentClient,
-            AIFoundryConfig,
-            AIFoundryWeatherAgentError,
-            create_ai_foundry_weather_client
-        )
-        print("✅ AIFoundryWeatherAgentClient module imports successfully")
-        return True
-    except ImportError as e:
-        print(f"❌ Failed to import AIFoundryWeatherAgentClient: {e}")
-        return False
-
-
-def test_cli():
-    """Test CLI help functionality."""
-    print("\n🔍 Testing CLI functionality...")
-    
-    try:
-        import main
-        print("✅ Main CLI module imports successfully")
-        return True
-    except ImportError as e:
-        print(f"❌ Failed to import main CLI: {e}")
-        return False
-
-
-def test_configuration():
-    """Test configuration loading."""
-    print("\n🔍 Testing configuration...")
-    
-    try:
-        from ai_foundry_weather_client import AIFoundryConfig
-        
-        # Test default configuration
-        config = AIFoundryConfig(project_connection_string="test://example")
-        print(f"✅ Default config created: timeout={config.timeout}s, retries={config.max_retries}")
-        
-        # Test custom configuration
-        custom_config = AIFoundryConfig(
-            project_connection_string="test://example",
-            timeout=120,
-            max_retries=5
-        )
-        print(f"✅ Custom config created: timeout={custom_config.timeout}s, retries={custom_config.max_retries}")
-        
-        return True
-    except Exception as e:
-        print(f"❌ Configuration test failed: {e}")
-        return False
-
-
-def print_next_steps():
-    """Print next steps for the user."""
-    print("\n🚀 Next Steps:")
-    print("1. Configure your Azure AI Foundry project connection string in .env:")
-    print("   AZURE_AI_PROJECT_CONNECTION_STRING=your_actual_connection_string")
-    print("")
-    print("2. Set up Azure authentication (choose one):")
-    print("   - Azure CLI: az login")
-    print("   - Service Principal: Set AZURE_CLIENT_ID, AZURE_CLIENT_SECRET, AZURE_TENANT_ID")
-    print("   - Managed Identity: Available automatically on Azure resources")
-    print("")
-    print("3. Test the application with a sample city:")
-    print("   python main.py weather Milan")
-    print("")
-    print("4. Run the example script:")
-    print("   python example.py")
-    print("")
-    print("5. Test the configuration:")
-    print("   python main.py config")
-    print("")
-    print("6. Test batch processing:")
-    print("   python main.py batch Milan Rome Paris")
-    print("")
-    print("7. Run connection test:")
-    print("   python main.py test")
-
-
-def main():
-    """Run all tests."""
-    print("🧪 Weather Agent Python App - Setup Verification")
-    print("=" * 50)
-    
-    tests = [
-        ("Python Version", check_python_version),
-        ("Dependencies", check_dependencies),
-        ("Project Files", check_files),
-        ("Module Import", test_import),
-        ("CLI Module", test_cli),
-        ("Configuration", test_configuration)
-    ]
-    
-    passed = 0
-    failed = 0
-    
-    for test_name, test_func in tests:
-        try:
-            if test_func():
-                passed += 1
-            else:
-                failed += 1
-        except Exception as e:
-            print(f"❌ {test_name} test failed with exception: {e}")
-            failed += 1
-    
-    print(f"\n📊 Test Results: {passed} passed, {failed} failed")
-    
-    if failed == 0:
-        print("\n🎉 All tests passed! The application is ready to use.")
-        print_next_steps()
-    else:
-        print(f"\n⚠️  {failed} test(s) failed. Please fix the issues above.")
-        
-        if failed > 0:
-            print("\n💡 Common fixes:")
-            print("- Install missing dependencies: pip install -r requirements.txt")
-            print("- Ensure you're in the correct directory")
-            print("- Check Python version (3.7+ required)")
-
-
-if __name__ == "__main__":
-    main()
+#!/usr/bin/env python3
+"""
+Test script to verify the Weather Agent Python App installation and basic functionality.
+
+This script performs basic tests to ensure the application is properly configured
+and can interact with the Weather Agent API.
+"""
+
+import sys
+import os
+import io
+import importlib.util
+import textwrap
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+
+# (pip package name, importable module name) pairs, built once at module
+# scope so repeated check_dependencies calls don't reallocate the list
+_REQUIRED_PACKAGES = (
+    ('azure-ai-projects', 'azure.ai.projects'),
+    ('azure-identity', 'azure.identity'),
+    ('click', 'click'),
+    ('pydantic', 'pydantic'),
+    ('python-dotenv', 'dotenv')
+)
+
+
+def check_python_version():
+    """Check if Python version is compatible."""
+    print("🔍 Checking Python version...")
+    
+    if sys.version_info < (3, 7):
+        print("❌ Python 3.7 or higher is required")
+        return False
+    
+    print(f"✅ Python {sys.version.split()[0]} is compatible")
+    return True
+
+
+def check_dependencies():
+    """Check if required dependencies are installed."""
+    print("\n🔍 Checking dependencies...")
+    
+    def spec_missing(import_name):
+        # find_spec raises (rather than returning None) when the parent
+        # package of a dotted name is itself absent
+        try:
+            return importlib.util.find_spec(import_name) is None
+        except ModuleNotFoundError:
+            return True
+
+    # find_spec checks presence via the loader registry without
+    # executing the module, so the big SDK packages stay unloaded
+    missing_packages = [
+        package_name
+        for package_name, import_name in _REQUIRED_PACKAGES
+        if spec_missing(import_name)
+    ]
+
+    for package_name, _ in _REQUIRED_PACKAGES:
+        if package_name in missing_packages:
+            print(f"❌ {package_name} is missing")
+        else:
+            print(f"✅ {package_name} is installed")
+    
+    if missing_packages:
+        print(f"\n📦 To install missing packages, run:")
+        print(f"pip install {' '.join(missing_packages)}")
+        return False
+    
+    return True
+
+
+def check_files():
+    """Check if required files exist."""
+    print("\n🔍 Checking project files...")
+    
+    required_files = [
+        'main.py',
+        'ai_foundry_weather_client.py',
+        'example.py',
+        'requirements.txt',
+        'README.md'
+    ]
+    
+    # One directory scan instead of one stat syscall per file
+    present = {entry.name for entry in os.scandir('.')}
+
+    missing_files = []
+
+    for file in required_files:
+        if file in present:
+            print(f"✅ {file} exists")
+        else:
+            print(f"❌ {file} is missing")
+            missing_files.append(file)
+    
+    return len(missing_files) == 0
+
+
+def test_import():
+    """Test importing the AI Foundry weather client module."""
+    print("\n🔍 Testing module imports...")
+    
+    try:
+        from ai_foundry_weather_client import (
+            AIFoundryWeatherAgentClient,
+            AIFoundryConfig,
+            AIFoundryWeatherAgentError,
+            create_ai_foundry_weather_client
+        )
+        print("✅ AIFoundryWeatherAgentClient module imports successfully")
+        return True
+    except ImportError as e:
+        print(f"❌ Failed to import AIFoundryWeatherAgentClient: {e}")
+        return False
+
+
+def test_cli():
+    """Test CLI help functionality."""
+    print("\n🔍 Testing CLI functionality...")
+    
+    try:
+        import main
+        print("✅ Main CLI module imports successfully")
+        return True
+    except ImportError as e:
+        print(f"❌ Failed to import main CLI: {e}")
+        return False
+
+
+def test_configuration():
+    """Test configuration loading."""
+    print("\n🔍 Testing configuration...")
+    
+    try:
+        from ai_foundry_weather_client import AIFoundryConfig
+        
+        # Test default configuration
+        config = AIFoundryConfig(project_connection_string="test://example")
+        print(f"✅ Default config created: timeout={config.timeout}s, retries={config.max_retries}")
+        
+        # Test custom configuration
+        custom_config = AIFoundryConfig(
+            project_connection_string="test://example",
+            timeout=120,
+            max_retries=5
+        )
+        print(f"✅ Custom config created: timeout={custom_config.timeout}s, retries={custom_config.max_retries}")
+        
+        return True
+    except Exception as e:
+        print(f"❌ Configuration test failed: {e}")
+        return False
+
+
+def print_next_steps():
+    """Print next steps for the user."""
+    # One write for the whole block instead of ~20 separate print calls
+    print(textwrap.dedent("""
+        🚀 Next Steps:
+        1. Configure your Azure AI Foundry project connection string in .env:
+           AZURE_AI_PROJECT_CONNECTION_STRING=your_actual_connection_string
+
+        2. Set up Azure authentication (choose one):
+           - Azure CLI: az login
+           - Service Principal: Set AZURE_CLIENT_ID, AZURE_CLIENT_SECRET, AZURE_TENANT_ID
+           - Managed Identity: Available automatically on Azure resources
+
+        3. Test the application with a sample city:
+           python main.py weather Milan
+
+        4. Run the example script:
+           python example.py
+
+        5. Test the configuration:
+           python main.py config
+
+        6. Test batch processing:
+           python main.py batch Milan Rome Paris
+
+        7. Run connection test:
+           python main.py test""").rstrip('\n'))
+
+
+class _PerThreadStdout(io.TextIOBase):
+    """Route print() to a per-thread buffer when one is registered.
+
+    contextlib.redirect_stdout swaps sys.stdout process-wide, which breaks
+    when checks run concurrently; this proxy keeps each worker's output in
+    its own buffer while the main thread keeps writing through.
+    """
+
+    def __init__(self, fallback):
+        self.fallback = fallback
+        self.local = threading.local()
+
+    def write(self, text):
+        target = getattr(self.local, 'buffer', None) or self.fallback
+        return target.write(text)
+
+    def flush(self):
+        (getattr(self.local, 'buffer', None) or self.fallback).flush()
+
+
+def main():
+    """Run all tests."""
+    print("🧪 Weather Agent Python App - Setup Verification")
+    print("=" * 50)
+    
+    tests = [
+        ("Dependencies", check_dependencies),
+        ("Project Files", check_files),
+        ("Module Import", test_import),
+        ("CLI Module", test_cli),
+        ("Configuration", test_configuration)
+    ]
+
+    passed = 0
+    failed = 0
+
+    # The version gate runs first on its own: the other checks assume a
+    # working interpreter
+    if check_python_version():
+        passed += 1
+    else:
+        failed += 1
+
+    proxy = _PerThreadStdout(sys.stdout)
+
+    def run_check(test_name, test_func):
+        """Run one check with its output captured so parallel runs don't interleave."""
+        buffer = proxy.local.buffer = io.StringIO()
+        try:
+            ok = test_func()
+        except Exception as e:
+            print(f"❌ {test_name} test failed with exception: {e}")
+            ok = False
+        finally:
+            proxy.local.buffer = None
+        return ok, buffer.getvalue()
+
+    # The remaining checks are independent and I/O- or import-bound, so
+    # run them concurrently; wall time becomes the slowest check instead
+    # of the sum. Output is printed in submission order for stability.
+    original_stdout = sys.stdout
+    sys.stdout = proxy
+    try:
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            futures = [executor.submit(run_check, name, func) for name, func in tests]
+            for future in futures:
+                ok, output = future.result()
+                print(output, end='')
+                if ok:
+                    passed += 1
+                else:
+                    failed += 1
+    finally:
+        sys.stdout = original_stdout
+    
+    print(f"\n📊 Test Results: {passed} passed, {failed} failed")
+    
+    if failed == 0:
+        print("\n🎉 All tests passed! The application is ready to use.")
+        print_next_steps()
+    else:
+        print(f"\n⚠️  {failed} test(s) failed. Please fix the issues above.")
+        
+        if failed > 0:
+            print("\n💡 Common fixes:")
+            print("- Install missing dependencies: pip install -r requirements.txt")
+            print("- Ensure you're in the correct directory")
+            print("- Check Python version (3.7+ required)")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,409 +1,742 @@
-"""
-Azure AI Foundry Project Chat Application
-Enterprise-grade implementation following Azure best practices.
-
-Features:
-- Azure AI Projects SDK with inference client for simple chat
-- Retry logic with exponential backoff
-- Token caching and refresh
-- Secure credential chain (Managed Identity → Azure CLI)
-- Comprehensive error handling
-- Performance monitoring
-
-This implementation uses Azure AI Foundry project's inference client
-to access deployed models through a simple chat interface (not agents).
-"""
-
-import os
-import logging
-import requests
-import json
-import time
-import random
-from datetime import datetime, timedelta
-from dotenv import load_dotenv
-from azure.identity import DefaultAzureCredential
-from azure.ai.projects import AIProjectClient
-from azure.core.exceptions import ServiceRequestError, HttpResponseError
-from typing import Dict, Any, Optional, Tuple
-
-def setup_logging():
-    """Configure logging with appropriate level."""
-    logging.basicConfig(
-        level=logging.INFO,
-        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-    )
-
-# Initialize logger
-logger = logging.getLogger(__name__)
-
-class AIFoundryClient:
-    """
-    Enterprise-grade Azure AI Foundry client following Azure best practices.
-    Uses Azure AI Projects SDK with inference client for simple chat.
-    
-    Features:
-    - Azure AI Projects SDK integration via inference client
-    - Retry logic with exponential backoff
-    - Secure credential chain (Managed Identity → Azure CLI)
-    - Comprehensive error handling
-    - Performance monitoring
-    """
-    
-    def __init__(self, config: Dict[str, Any]):
-        self.config = config
-        self.credential = self._get_secure_credential()
-        self._project_client = None
-        self._openai_client = None
-        self._max_retries = 3
-        self._base_delay = 1.0  # Base delay for exponential backoff
-        
-        # Initialize the AI Project client
-        self._initialize_project_client()
-        
-        logger.info("✅ AIFoundryClient initialized with enterprise security features")
-    
-    def _get_secure_credential(self) -> DefaultAzureCredential:
-        """
-        Get Azure credential using secure credential chain.
-        Follows Azure best practices: Managed Identity → Azure CLI → fallback
-        """
-        try:
-            # Create credential chain following Azure security best practices
-            credential = DefaultAzureCredential(
-                exclude_interactive_browser_credential=True,
-                exclude_shared_token_cache_credential=True,
-                exclude_visual_studio_code_credential=True,
-                exclude_visual_studio_credential=True,
-                exclude_powershell_credential=True
-            )
-            
-            # Test the credential to ensure it works
-            test_token = credential.get_token("https://management.azure.com/.default")
-            logger.info("✅ Azure credentials validated successfully")
-            logger.info("🔐 Using secure credential chain: Managed Identity → Azure CLI")
-            return credential
-        
-        except Exception as e:
-            logger.error(f"❌ Failed to obtain Azure credentials: {e}")
-            logger.error("💡 Ensure you have:")
-            logger.error("   - Managed Identity assigned (for Azure-hosted apps)")
-            logger.error("   - Azure CLI authenticated (for development)")
-            logger.error("   - Proper RBAC permissions")
-            raise
-    
-    def _initialize_project_client(self):
-        """
-        Initialize Azure AI Project client for simple chat inference.
-        Uses inference client to access deployed models through the AI Foundry project.
-        """
-        try:
-            logger.info("🔌 Initializing Azure AI Project client...")
-            
-            # Get the project endpoint from config
-            project_endpoint = self.config['project_endpoint']
-            
-            # Create the project client with simplified configuration
-            # Only endpoint and credential are required for basic inference
-            self._project_client = AIProjectClient(
-                endpoint=project_endpoint,
-                credential=self.credential
-            )
-            
-            # Get the Azure OpenAI client from the project for inference
-            logger.info("🔌 Getting Azure OpenAI inference client from project...")
-            self._openai_client = self._project_client.inference.get_azure_openai_client(
-                api_version=self.config['api_version']
-            )
-            
-            logger.info("✅ Azure AI Project inference client initialized successfully")
-            logger.info(f"🎯 Ready to use deployment: {self.config['deployment_name']}")
-            
-        except Exception as e:
-            logger.error(f"❌ Failed to initialize project client: {e}")
-            logger.error("💡 Check your project endpoint and authentication")
-            logger.error("💡 Falling back to direct Azure OpenAI endpoint if available...")
-            self._project_client = None
-            self._openai_client = None
-    
-    def _retry_with_backoff(self, operation_name: str, operation_func, *args, **kwargs):
-        """
-        Execute operation with exponential backoff retry logic.
-        Implements Azure best practices for transient failure handling.
-        """
-        last_exception = None
-        
-        for attempt in range(self._max_retries + 1):
-            try:
-                if attempt > 0:
-                    # Calculate exponential backoff delay with jitter
-                    delay = self._base_delay * (2 ** (attempt - 1))
-                    jitter = random.uniform(0.1, 0.3) * delay
-                    total_delay = delay + jitter
-                    
-                    logger.info(f"🔄 Retrying {operation_name} (attempt {attempt + 1}/{self._max_retries + 1}) after {total_delay:.1f}s")
-                    time.sleep(total_delay)
-                
-                result = operation_func(*args, **kwargs)
-                if attempt > 0:
-                    logger.info(f"✅ {operation_name} succeeded on retry attempt {attempt + 1}")
-                return result
-                
-            except Exception as e:
-                last_exception = e
-                if attempt < self._max_retries:
-                    # Check if it's a retryable error
-                    if hasattr(e, 'response') and e.response is not None:
-                        status_code = e.response.status_code
-                        # Only retry on transient failures
-                        if status_code in [429, 500, 502, 503, 504]:
-                            logger.warning(f"⚠️ Transient failure for {operation_name}: {status_code}")
-                            continue
-                        else:
-                            logger.error(f"❌ Non-retryable error for {operation_name}: {status_code}")
-                            break
-                    else:
-                        # Network errors or SDK exceptions - retry
-                        logger.warning(f"⚠️ Error for {operation_name}: {e}")
-                        continue
-                else:
-                    logger.error(f"❌ Max retries exceeded for {operation_name}")
-        
-        # All retries failed
-        logger.error(f"❌ {operation_name} failed after {self._max_retries + 1} attempts")
-        raise last_exception
-    
-    def _make_sdk_request(self, messages: list) -> str:
-        """
-        Make request using Azure AI Projects SDK inference client.
-        This connects to the model through the AI Foundry project.
-        """
-        if not self._openai_client:
-            raise Exception("Azure AI Projects inference client not available")
-        
-        logger.info("📡 Using Azure AI Foundry project inference client...")
-        
-        try:
-            response = self._openai_client.chat.completions.create(
-                model=self.config['deployment_name'],
-                messages=messages,
-                max_tokens=800,
-                temperature=0.7
-            )
-            
-            logger.info("✅ Response received from AI Foundry project")
-            return response.choices[0].message.content
-            
-        except Exception as e:
-            logger.error(f"❌ AI Foundry inference request failed: {e}")
-            raise
-    
-    def _make_direct_request(self, messages: list) -> str:
-        """
-        Make direct API request as fallback when AI Foundry project inference is not available.
-        """
-        logger.info("📡 Using direct Azure OpenAI API request (fallback)...")
-        
-        # Get fresh token
-        token_response = self.credential.get_token("https://cognitiveservices.azure.com/.default")
-        
-        # Use the Azure OpenAI endpoint from config or environment
-        openai_endpoint = self.config.get('azure_openai_endpoint') or os.getenv('AZURE_OPENAI_ENDPOINT')
-        if not openai_endpoint:
-            raise Exception("No Azure OpenAI endpoint available for fallback. Configure AZURE_OPENAI_ENDPOINT.")
-            
-        url = f"{openai_endpoint}openai/deployments/{self.config['deployment_name']}/chat/completions?api-version={self.config['api_version']}"
-        
-        headers = {
-            'Authorization': f"Bearer {token_response.token}",
-            'Content-Type': 'application/json',
-            'User-Agent': 'Azure-AI-Foundry-Client/1.0.0'
-        }
-        
-        payload = {
-            'messages': messages,
-            'max_tokens': 800,
-            'temperature': 0.7,
-            'stream': False
-        }
-        
-        response = requests.post(url, headers=headers, json=payload, timeout=30)
-        response.raise_for_status()
-        
-        result = response.json()
-        return result['choices'][0]['message']['content']
-    
-    def chat_completion(self, messages: list) -> str:
-        """
-        Generate chat completion using Azure AI Foundry project inference client.
-        Uses the project's deployed model for simple chat completions.
-        
-        Args:
-            messages: List of message dictionaries with 'role' and 'content'
-            
-        Returns:
-            str: The assistant's response content
-            
-        Raises:
-            Exception: If all retry attempts fail
-        """
-        try:
-            logger.info(f"🤖 Generating completion via AI Foundry project: {self.config['project_name']}")
-            
-            # Try AI Foundry project inference first, fallback to direct API
-            def _attempt_completion():
-                if self._openai_client:
-                    logger.info("🔌 Using Azure AI Foundry project inference client")
-                    return self._make_sdk_request(messages)
-                else:
-                    logger.info("🔄 Using direct API (fallback)")
-                    return self._make_direct_request(messages)
-            
-            # Execute with retry logic
-            content = self._retry_with_backoff(
-                "chat_completion",
-                _attempt_completion
-            )
-            
-            logger.info("✅ Chat completion generated successfully")
-            return content
-            
-        except Exception as e:
-            logger.error(f"❌ Chat completion failed: {e}")
-            if hasattr(e, 'response') and e.response is not None:
-                logger.error(f"📊 Response status: {e.response.status_code}")
-                logger.error(f"📄 Response text: {e.response.text}")
-            raise
-
-def load_configuration():
-    """
-    Load configuration from environment variables following Azure best practices.
-    Implements proper configuration validation and security for AI Foundry projects.
-    """
-    try:
-        # Load from enterprise-specific configuration file
-        load_dotenv('.env.enterprise')
-        
-        config = {
-            # AI Foundry project endpoint (primary configuration)
-            'project_endpoint': os.getenv('PROJECT_ENDPOINT') or os.getenv('AZURE_AI_PROJECT_ENDPOINT'),
-            
-            # Model deployment configuration
-            'deployment_name': os.getenv('AZURE_OPENAI_DEPLOYMENT_NAME', 'gpt-4o-mini'),
-            'api_version': os.getenv('AZURE_OPENAI_API_VERSION', '2025-01-01-preview'),
-            
-            # Project metadata
-            'project_name': os.getenv('PROJECT_NAME', 'aiproject-14i6qb'),
-            
-            # Authentication (optional - prefer managed identity)
-            'azure_openai_api_key': os.getenv('AZURE_OPENAI_API_KEY'),
-            
-            # Optional: Direct Azure OpenAI endpoint for fallback
-            'azure_openai_endpoint': os.getenv('AZURE_OPENAI_ENDPOINT'),
-            
-            # Optional: Azure subscription details (usually not needed)
-            'subscription_id': os.getenv('AZURE_SUBSCRIPTION_ID'),
-            'resource_group': os.getenv('AZURE_RESOURCE_GROUP')
-        }
-        
-        # Validate required configuration
-        if not config['project_endpoint']:
-            logger.error("❌ Missing PROJECT_ENDPOINT or AZURE_AI_PROJECT_ENDPOINT")
-            logger.error("💡 Set PROJECT_ENDPOINT=https://your-ai-foundry-project.cognitiveservices.azure.com/")
-            return None
-            
-        if not config['azure_openai_api_key']:
-            logger.info("✅ No API key provided, using Azure managed identity (recommended)")
-            config['use_managed_identity'] = True
-        else:
-            logger.warning("⚠️ Using API key authentication (consider migrating to managed identity)")
-            config['use_managed_identity'] = False
-            
-        logger.info("✅ Configuration loaded successfully")
-        logger.info(f"📍 AI Foundry Project: {config['project_name']}")
-        logger.info(f"🔗 Project Endpoint: {config['project_endpoint']}")
-        logger.info(f"🎯 Deployment Name: {config['deployment_name']}")
-        logger.info(f"🔐 Using Managed Identity: {config['use_managed_identity']}")
-        
-        return config
-        
-    except Exception as e:
-        logger.error(f"❌ Failed to load configuration: {e}")
-        return None
-
-def main():
-    """
-    Main function for Azure AI Foundry project chat application.
-    Implements enterprise-grade patterns following Azure best practices.
-    """
-    setup_logging()
-    logger.info("🚀 Starting Azure AI Foundry Project Chat Application (Enterprise Edition)")
-    
-    try:
-        # Load configuration with validation
-        config = load_configuration()
-        if not config:
-            logger.error("❌ Failed to load configuration")
-            return
-        
-        # Create enterprise AI Foundry client
-        ai_client = AIFoundryClient(config)
-        logger.info("✅ Enterprise AI Foundry client initialized")
-        
-        logger.info("🤖 Chat application ready!")
-        
-        # Enhanced chat loop with better UX
-        print(f"\n🤖 Azure AI Foundry Chat - Project: {config['project_name']}")
-        print(f"🎯 Using deployment: {config['deployment_name']}")
-        print("💡 Features: AI Foundry project inference + Direct API fallback, retry logic, secure authentication")
-        print("Type 'exit' to quit\n")
-        
-        conversation_history = [
-            {"role": "system", "content": f"You are a helpful AI assistant powered by Azure AI Foundry project '{config['project_name']}' using deployment '{config['deployment_name']}'. You provide accurate and helpful responses through the AI Foundry inference client."}
-        ]
-        
-        while True:
-            try:
-                # Get user input
-                user_input = input("You: ").strip()
-                
-                if user_input.lower() in ['exit', 'quit', 'bye']:
-                    print("👋 Goodbye!")
-                    break
-                    
-                if not user_input:
-                    continue
-                
-                # Add user message to conversation
-                conversation_history.append({"role": "user", "content": user_input})
-                
-                # Generate response using enterprise client
-                print("🤔 Thinking...", end="", flush=True)
-                response = ai_client.chat_completion(conversation_history)
-                print("\r" + " " * 15 + "\r", end="")  # Clear "Thinking..."
-                
-                if response:
-                    print(f"Assistant: {response}\n")
-                    # Add assistant response to conversation
-                    conversation_history.append({"role": "assistant", "content": response})
-                else:
-                    print("❌ Sorry, I couldn't generate a response. Please try again.\n")
-                    # Remove the user message since we couldn't respond
-                    conversation_history.pop()
-            
-            except KeyboardInterrupt:
-                print("\n👋 Goodbye!")
-                break
-            except Exception as e:
-                logger.error(f"❌ Error in main loop: {e}")
-                print(f"⚠️ An error occurred: {e}. Please try again.\n")
-                # Remove the user message if there was an error
-                if len(conversation_history) > 1 and conversation_history[-1]["role"] == "user":
-                    conversation_history.pop()
-    
-    except Exception as e:
-        logger.error(f"❌ Application startup failed: {e}")
-        print(f"❌ Failed to start application: {e}")
-
-if __name__ == '__main__':
-    main()
+"""
+Azure AI Foundry Project Chat Application
+Enterprise-grade implementation following Azure best practices.
+
+Features:
+- Azure AI Projects SDK with inference client for simple chat
+- Retry logic with exponential backoff
+- Token caching and refresh
+- Secure credential chain (Managed Identity → Azure CLI)
+- Comprehensive error handling
+- Performance monitoring
+
+This implementation uses Azure AI Foundry project's inference client
+to access deployed models through a simple chat interface (not agents).
+"""
+
+import collections
+import functools
+import os
+import logging
+import json
+import threading
+import time
+import random
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from email.utils import parsedate_to_datetime
+from typing import Dict, Any, Optional, Tuple
+
+# The Azure SDK packages and requests together cost several hundred ms
+# at import. They are pulled in lazily by the methods that need them, so
+# importing this module (e.g. from tests or tooling) stays fast and the
+# SDK-only path never pays for the fallback stack.
+
+def setup_logging():
+    """Configure logging with appropriate level."""
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+    )
+
+# Initialize logger
+logger = logging.getLogger(__name__)
+
+# orjson (C-accelerated) is picked up when available; multi-KB message
+# histories serialize several times faster than with stdlib json. The
+# stdlib fallback keeps the module dependency-free.
+try:
+    import orjson
+
+    def _json_dumps(obj) -> bytes:
+        return orjson.dumps(obj)
+
+    _json_loads = orjson.loads
+except ImportError:
+    def _json_dumps(obj) -> bytes:
+        return json.dumps(obj).encode('utf-8')
+
+    _json_loads = json.loads
+
+@functools.lru_cache(maxsize=1)
+def _retryable_exceptions():
+    """Exceptions that indicate the request may never have reached the
+    service, so retrying is safe; anything else is only retried on a
+    retryable status. Resolved lazily so the exception types don't force
+    the SDK imports at module load."""
+    import requests
+    from azure.core.exceptions import ServiceRequestError
+    return (
+        ServiceRequestError,
+        requests.exceptions.ConnectionError,
+        requests.exceptions.Timeout,
+    )
+
+# Transient HTTP status codes worth retrying (408 added: request timeout)
+_RETRYABLE_STATUS = frozenset({408, 429, 500, 502, 503, 504})
+
+# Never sleep longer than this between attempts, whatever backoff says
+_MAX_RETRY_DELAY = 30.0
+
+# Interactive-loop literals, built once: frozenset membership beats a
+# per-keystroke list scan, and the clear-line string isn't reallocated
+# on every turn
+_EXIT_CMDS = frozenset({'exit', 'quit', 'bye'})
+_CLEAR_LINE = "\r" + " " * 15 + "\r"
+
+
+def _retry_after_seconds(response) -> Optional[float]:
+    """Parse a Retry-After header as delta-seconds or an HTTP date."""
+    headers = getattr(response, 'headers', None)
+    if not headers:
+        return None
+    retry_after = headers.get('Retry-After') or headers.get('retry-after')
+    if not retry_after:
+        return None
+    try:
+        return max(0.0, float(retry_after))
+    except ValueError:
+        pass
+    try:
+        when = parsedate_to_datetime(retry_after)
+        return max(0.0, (when - datetime.now(timezone.utc)).total_seconds())
+    except (TypeError, ValueError):
+        return None
+
+class AIFoundryClient:
+    """
+    Enterprise-grade Azure AI Foundry client following Azure best practices.
+    Uses Azure AI Projects SDK with inference client for simple chat.
+    
+    Features:
+    - Azure AI Projects SDK integration via inference client
+    - Retry logic with exponential backoff
+    - Secure credential chain (Managed Identity → Azure CLI)
+    - Comprehensive error handling
+    - Performance monitoring
+    """
+    
+    def __init__(self, config: "FoundryConfig"):
+        import requests
+        from requests.adapters import HTTPAdapter
+
+        self.config = config
+        self.credential = self._get_secure_credential()
+        self._project_client = None
+        self._openai_client = None
+        self._max_retries = 2
+        self._base_delay = 1.0  # Base delay for exponential backoff
+        self._cached_token = None  # Last AccessToken, reused until near expiry
+        self._token_lock = threading.Lock()
+        self._token_scope = None  # Scope of the cached token, for refresh
+
+        # Single background worker that renews the token while the user
+        # reads the previous answer, hiding the 100-1000 ms credential
+        # round-trip behind think time instead of the next request
+        self._token_exec = ThreadPoolExecutor(max_workers=1)
+        self._token_refreshing = False
+
+        # One pooled HTTPS session for the direct-API fallback: reusing
+        # the TCP+TLS connection amortizes the handshake across requests
+        self._session = requests.Session()
+        self._session.mount('https://', HTTPAdapter(pool_connections=10, pool_maxsize=20, max_retries=0))
+
+        # Precompute the direct-API request pieces once instead of
+        # re-resolving the endpoint and rebuilding headers per call.
+        # _direct_url stays None when no fallback endpoint is configured.
+        openai_endpoint = self.config.azure_openai_endpoint
+        self._direct_url = None
+        if openai_endpoint:
+            self._direct_url = f"{openai_endpoint}openai/deployments/{self.config.deployment_name}/chat/completions?api-version={self.config.api_version}"
+        self._base_headers = {
+            'Content-Type': 'application/json',
+            'User-Agent': 'Azure-AI-Foundry-Client/1.0.0'
+        }
+
+        # Initialize the AI Project client
+        self._initialize_project_client()
+
+        logger.info("✅ AIFoundryClient initialized with enterprise security features")
+
+    def _get_access_token(self, scope: str):
+        """
+        Get an access token for the given scope, reusing the cached one
+        until ~5 minutes before expiry.
+
+        Dev credentials like Azure CLI spawn a subprocess on every
+        get_token call; caching by expires_on removes that cost from
+        every chat turn.
+        """
+        with self._token_lock:
+            if self._cached_token is not None and self._cached_token.expires_on - time.time() > 300:
+                return self._cached_token
+
+        token = self.credential.get_token(scope)
+        with self._token_lock:
+            self._cached_token = token
+            self._token_scope = scope
+        return token
+
+    def _refresh_token(self):
+        """Renew the cached token in the background (see prefetch_token)."""
+        try:
+            token = self.credential.get_token(self._token_scope)
+            with self._token_lock:
+                self._cached_token = token
+        except Exception as e:
+            # Non-fatal: the next request falls back to a synchronous
+            # refresh through _get_access_token
+            logger.warning(f"⚠️ Background token refresh failed: {e}")
+        finally:
+            self._token_refreshing = False
+
+    def prefetch_token(self):
+        """
+        Kick off a background refresh when the cached token is within
+        ten minutes of expiry. Called after each completed chat turn so
+        the renewal overlaps user think time and no request ever blocks
+        on token acquisition.
+        """
+        with self._token_lock:
+            token = self._cached_token
+            if token is None or self._token_scope is None or self._token_refreshing:
+                return
+            if token.expires_on - time.time() >= 600:
+                return
+            self._token_refreshing = True
+        self._token_exec.submit(self._refresh_token)
+    
+    def _get_secure_credential(self) -> "DefaultAzureCredential":
+        """
+        Get Azure credential using secure credential chain.
+        Follows Azure best practices: Managed Identity → Azure CLI → fallback
+
+        The credential is not probed here: the old startup token request
+        against management.azure.com added a full auth round-trip for a
+        scope this app never uses. DefaultAzureCredential validates
+        itself on the first real get_token call, and that failure
+        surfaces with the same guidance below.
+        """
+        try:
+            from azure.identity import DefaultAzureCredential
+
+            # Create credential chain following Azure security best practices
+            credential = DefaultAzureCredential(
+                exclude_interactive_browser_credential=True,
+                exclude_shared_token_cache_credential=True,
+                exclude_visual_studio_code_credential=True,
+                exclude_visual_studio_credential=True,
+                exclude_powershell_credential=True
+            )
+
+            logger.info("🔐 Using secure credential chain: Managed Identity → Azure CLI")
+            return credential
+
+        except Exception as e:
+            logger.error(f"❌ Failed to obtain Azure credentials: {e}")
+            logger.error("💡 Ensure you have:")
+            logger.error("   - Managed Identity assigned (for Azure-hosted apps)")
+            logger.error("   - Azure CLI authenticated (for development)")
+            logger.error("   - Proper RBAC permissions")
+            raise
+    
+    def _initialize_project_client(self):
+        """
+        Initialize Azure AI Project client for simple chat inference.
+        Uses inference client to access deployed models through the AI Foundry project.
+        """
+        try:
+            from azure.ai.projects import AIProjectClient
+
+            logger.info("🔌 Initializing Azure AI Project client...")
+            
+            # Get the project endpoint from config
+            project_endpoint = self.config.project_endpoint
+            
+            # Create the project client with simplified configuration
+            # Only endpoint and credential are required for basic inference
+            self._project_client = AIProjectClient(
+                endpoint=project_endpoint,
+                credential=self.credential
+            )
+            
+            # Get the Azure OpenAI client from the project for inference
+            logger.info("🔌 Getting Azure OpenAI inference client from project...")
+            self._openai_client = self._project_client.inference.get_azure_openai_client(
+                api_version=self.config.api_version
+            )
+            
+            logger.info("✅ Azure AI Project inference client initialized successfully")
+            logger.info(f"🎯 Ready to use deployment: {self.config.deployment_name}")
+            
+        except Exception as e:
+            logger.error(f"❌ Failed to initialize project client: {e}")
+            logger.error("💡 Check your project endpoint and authentication")
+            logger.error("💡 Falling back to direct Azure OpenAI endpoint if available...")
+            self._project_client = None
+            self._openai_client = None
+    
+    def _retry_with_backoff(self, operation_name: str, operation_func, *args, **kwargs):
+        """
+        Execute operation with exponential backoff retry logic.
+        Implements Azure best practices for transient failure handling:
+        only connection-level exceptions and known-transient status codes
+        are retried, Retry-After from the service takes precedence over
+        computed backoff, and full jitter spreads concurrent retries.
+        """
+        last_exception = None
+        
+        for attempt in range(self._max_retries + 1):
+            try:
+                result = operation_func(*args, **kwargs)
+                if attempt > 0:
+                    logger.info(f"✅ {operation_name} succeeded on retry attempt {attempt + 1}")
+                return result
+                
+            except Exception as e:
+                last_exception = e
+                
+                status_code = None
+                response = getattr(e, 'response', None)
+                if response is not None:
+                    status_code = getattr(response, 'status_code', None)
+                
+                if status_code is not None:
+                    if status_code not in _RETRYABLE_STATUS:
+                        logger.error(f"❌ Non-retryable error for {operation_name}: {status_code}")
+                        break
+                elif not isinstance(e, _retryable_exceptions()):
+                    logger.error(f"❌ Non-retryable error for {operation_name}: {e}")
+                    break
+                
+                if attempt >= self._max_retries:
+                    logger.error(f"❌ Max retries exceeded for {operation_name}")
+                    break
+                
+                # Prefer the service-supplied Retry-After; otherwise full
+                # jitter over the capped exponential window
+                delay = _retry_after_seconds(response)
+                if delay is None:
+                    delay = random.uniform(0, min(_MAX_RETRY_DELAY, self._base_delay * (2 ** attempt)))
+                delay = min(delay, _MAX_RETRY_DELAY)
+                
+                logger.warning(f"⚠️ Transient failure for {operation_name}: {status_code or e}")
+                logger.info(f"🔄 Retrying {operation_name} (attempt {attempt + 2}/{self._max_retries + 1}) after {delay:.1f}s")
+                time.sleep(delay)
+        
+        # All retries failed
+        logger.error(f"❌ {operation_name} failed after {attempt + 1} attempt(s)")
+        raise last_exception
+    
+    def _make_sdk_request(self, messages: list, on_delta=None) -> str:
+        """
+        Make request using Azure AI Projects SDK inference client.
+        This connects to the model through the AI Foundry project.
+
+        When on_delta is given the completion is streamed and each text
+        fragment is passed to the callback as it arrives, so the caller
+        can show output at time-to-first-token instead of waiting for
+        the full generation.
+        """
+        if not self._openai_client:
+            raise Exception("Azure AI Projects inference client not available")
+        
+        logger.info("📡 Using Azure AI Foundry project inference client...")
+        
+        try:
+            if on_delta is None:
+                response = self._openai_client.chat.completions.create(
+                    model=self.config.deployment_name,
+                    messages=messages,
+                    max_tokens=800,
+                    temperature=0.7
+                )
+
+                logger.info("✅ Response received from AI Foundry project")
+                return response.choices[0].message.content
+
+            stream = self._openai_client.chat.completions.create(
+                model=self.config.deployment_name,
+                messages=messages,
+                max_tokens=800,
+                temperature=0.7,
+                stream=True
+            )
+
+            parts = []
+            for chunk in stream:
+                if not chunk.choices:
+                    continue
+                delta = chunk.choices[0].delta.content
+                if delta:
+                    parts.append(delta)
+                    on_delta(delta)
+
+            logger.info("✅ Streamed response received from AI Foundry project")
+            return ''.join(parts)
+
+        except Exception as e:
+            logger.error(f"❌ AI Foundry inference request failed: {e}")
+            raise
+    
+    def _make_direct_request(self, messages: list, on_delta=None) -> str:
+        """
+        Make direct API request as fallback when AI Foundry project inference is not available.
+
+        With on_delta set, the request is streamed and SSE frames are
+        parsed incrementally, mirroring _make_sdk_request.
+        """
+        logger.info("📡 Using direct Azure OpenAI API request (fallback)...")
+        
+        if not self._direct_url:
+            raise Exception("No Azure OpenAI endpoint available for fallback. Configure AZURE_OPENAI_ENDPOINT.")
+
+        # Reuse the cached token while it's still live instead of paying a
+        # token acquisition per request; only the Authorization header
+        # varies between calls
+        token_response = self._get_access_token("https://cognitiveservices.azure.com/.default")
+        headers = {**self._base_headers, 'Authorization': f"Bearer {token_response.token}"}
+        
+        payload = {
+            'messages': messages,
+            'max_tokens': 800,
+            'temperature': 0.7,
+            'stream': on_delta is not None
+        }
+
+        # Encode once with the fast serializer; Content-Type is already
+        # set in the base headers
+        data = _json_dumps(payload)
+
+        if on_delta is None:
+            response = self._session.post(self._direct_url, headers=headers, data=data, timeout=30)
+            response.raise_for_status()
+
+            result = _json_loads(response.content)
+            return result['choices'][0]['message']['content']
+
+        response = self._session.post(self._direct_url, headers=headers, data=data, timeout=30, stream=True)
+        response.raise_for_status()
+
+        # Parse the SSE stream: each frame is "data: {json}" and the
+        # stream ends with "data: [DONE]"
+        parts = []
+        for line in response.iter_lines():
+            if not line or not line.startswith(b'data: '):
+                continue
+            data = line[len(b'data: '):]
+            if data == b'[DONE]':
+                break
+            chunk = _json_loads(data)
+            choices = chunk.get('choices') or []
+            if not choices:
+                continue
+            delta = choices[0].get('delta', {}).get('content')
+            if delta:
+                parts.append(delta)
+                on_delta(delta)
+
+        return ''.join(parts)
+    
+    def close(self):
+        """Release the pooled HTTP connections and the token worker."""
+        self._token_exec.shutdown(wait=False)
+        self._session.close()
+
+    def chat_completion(self, messages: list, on_delta=None) -> str:
+        """
+        Generate chat completion using Azure AI Foundry project inference client.
+        Uses the project's deployed model for simple chat completions.
+        
+        Args:
+            messages: List of message dictionaries with 'role' and 'content'
+            on_delta: Optional callback receiving each streamed text fragment
+            
+        Returns:
+            str: The assistant's response content
+            
+        Raises:
+            Exception: If all retry attempts fail
+        """
+        try:
+            logger.info(f"🤖 Generating completion via AI Foundry project: {self.config.project_name}")
+            
+            # Try AI Foundry project inference first, fallback to direct API
+            def _attempt_completion():
+                if self._openai_client:
+                    logger.info("🔌 Using Azure AI Foundry project inference client")
+                    return self._make_sdk_request(messages, on_delta)
+                else:
+                    logger.info("🔄 Using direct API (fallback)")
+                    return self._make_direct_request(messages, on_delta)
+            
+            # Execute with retry logic
+            content = self._retry_with_backoff(
+                "chat_completion",
+                _attempt_completion
+            )
+            
+            logger.info("✅ Chat completion generated successfully")
+            # Renew a near-expiry token off the hot path, overlapped
+            # with whatever the caller does next
+            self.prefetch_token()
+            return content
+            
+        except Exception as e:
+            # Lazy %-formatting, and the response body (which can be
+            # large and may echo request content) only renders at DEBUG
+            logger.error("❌ Chat completion failed: %s", e)
+            response = getattr(e, 'response', None)
+            if response is not None:
+                logger.error("📊 Response status: %s", getattr(response, 'status_code', None))
+                if logger.isEnabledFor(logging.DEBUG):
+                    logger.debug("📄 Response text: %s", response.text[:2048])
+            raise
+
+    def chat_completions_batch(self, batch: list, concurrency: int = 10) -> list:
+        """
+        Run many independent chat completions concurrently.
+
+        For bulk, non-interactive workloads issuing one synchronous
+        request per item serializes the waiting; fanning out over a
+        thread pool makes wall time roughly max(latency) instead of
+        sum(latency). Each worker goes through chat_completion, so the
+        retry/backoff and token-cache behavior are identical to the
+        interactive path. The pooled HTTPS session and the OpenAI SDK
+        client are both safe to share across threads.
+
+        Args:
+            batch: List of message lists, one per completion
+            concurrency: Maximum completions in flight at once
+
+        Returns:
+            list: Responses aligned with batch order; None where an
+            item failed (the failure is logged)
+        """
+        if not batch:
+            return []
+
+        results = [None] * len(batch)
+        with ThreadPoolExecutor(max_workers=min(concurrency, len(batch))) as executor:
+            futures = {
+                executor.submit(self.chat_completion, messages): index
+                for index, messages in enumerate(batch)
+            }
+            for future, index in futures.items():
+                try:
+                    results[index] = future.result()
+                except Exception as e:
+                    logger.warning(f"⚠️ Batch item {index} failed: {e}")
+        return results
+
+def _trim_messages(messages: list, max_turns: int = 12, max_chars: int = 24000) -> list:
+    """
+    Return the system prompt plus a bounded tail of the conversation.
+
+    Re-sending the whole transcript makes tokens-per-turn grow O(n) and
+    total tokens over a session O(n^2). The window keeps the last
+    max_turns messages, further capped by a character budget (~4 chars
+    per token) so a few huge messages can't blow the limit either.
+    """
+    head, tail = messages[:1], messages[1:]
+    if len(tail) > max_turns:
+        tail = tail[-max_turns:]
+
+    budget = 0
+    for index in range(len(tail) - 1, -1, -1):
+        budget += len(tail[index].get("content") or "")
+        if budget > max_chars:
+            # Keep at least the newest message even when it alone busts
+            # the budget: dropping it would send the model a request
+            # without the turn it is supposed to answer
+            tail = tail[index + 1:] or tail[-1:]
+            break
+
+    return head + tail
+
+
+@dataclass(frozen=True)
+class FoundryConfig:
+    """
+    Immutable application configuration, resolved once at startup.
+
+    Attribute access on a frozen dataclass replaces the per-use dict
+    lookups (and the os.getenv re-reads they hid), and immutability
+    makes the instance safe to share across the batch worker threads.
+    """
+    project_endpoint: str
+    deployment_name: str
+    api_version: str
+    project_name: str
+    azure_openai_api_key: Optional[str]
+    azure_openai_endpoint: Optional[str]
+    subscription_id: Optional[str]
+    resource_group: Optional[str]
+    use_managed_identity: bool
+
+
+def load_configuration():
+    """
+    Load configuration from environment variables following Azure best practices.
+    Implements proper configuration validation and security for AI Foundry projects.
+    """
+    try:
+        from dotenv import load_dotenv
+
+        # Load from enterprise-specific configuration file
+        load_dotenv('.env.enterprise')
+        
+        # AI Foundry project endpoint (primary configuration)
+        project_endpoint = os.getenv('PROJECT_ENDPOINT') or os.getenv('AZURE_AI_PROJECT_ENDPOINT')
+        
+        # Validate required configuration
+        if not project_endpoint:
+            logger.error("❌ Missing PROJECT_ENDPOINT or AZURE_AI_PROJECT_ENDPOINT")
+            logger.error("💡 Set PROJECT_ENDPOINT=https://your-ai-foundry-project.cognitiveservices.azure.com/")
+            return None
+        
+        # Authentication (optional - prefer managed identity)
+        azure_openai_api_key = os.getenv('AZURE_OPENAI_API_KEY')
+        if not azure_openai_api_key:
+            logger.info("✅ No API key provided, using Azure managed identity (recommended)")
+        else:
+            logger.warning("⚠️ Using API key authentication (consider migrating to managed identity)")
+        
+        config = FoundryConfig(
+            project_endpoint=project_endpoint,
+            # Model deployment configuration
+            deployment_name=os.getenv('AZURE_OPENAI_DEPLOYMENT_NAME', 'gpt-4o-mini'),
+            api_version=os.getenv('AZURE_OPENAI_API_VERSION', '2025-01-01-preview'),
+            # Project metadata
+            project_name=os.getenv('PROJECT_NAME', 'aiproject-14i6qb'),
+            azure_openai_api_key=azure_openai_api_key,
+            # Optional: Direct Azure OpenAI endpoint for fallback
+            azure_openai_endpoint=os.getenv('AZURE_OPENAI_ENDPOINT'),
+            # Optional: Azure subscription details (usually not needed)
+            subscription_id=os.getenv('AZURE_SUBSCRIPTION_ID'),
+            resource_group=os.getenv('AZURE_RESOURCE_GROUP'),
+            use_managed_identity=not azure_openai_api_key
+        )
+        
+        logger.info("✅ Configuration loaded successfully")
+        logger.info(f"📍 AI Foundry Project: {config.project_name}")
+        logger.info(f"🔗 Project Endpoint: {config.project_endpoint}")
+        logger.info(f"🎯 Deployment Name: {config.deployment_name}")
+        logger.info(f"🔐 Using Managed Identity: {config.use_managed_identity}")
+        
+        return config
+        
+    except Exception as e:
+        logger.error(f"❌ Failed to load configuration: {e}")
+        return None
+
+def main():
+    """
+    Main function for Azure AI Foundry project chat application.
+    Implements enterprise-grade patterns following Azure best practices.
+    """
+    setup_logging()
+    logger.info("🚀 Starting Azure AI Foundry Project Chat Application (Enterprise Edition)")
+    
+    try:
+        # Load configuration with validation
+        config = load_configuration()
+        if not config:
+            logger.error("❌ Failed to load configuration")
+            return
+        
+        # Create enterprise AI Foundry client
+        ai_client = AIFoundryClient(config)
+        logger.info("✅ Enterprise AI Foundry client initialized")
+        
+        logger.info("🤖 Chat application ready!")
+        
+        # Enhanced chat loop with better UX
+        print(f"\n🤖 Azure AI Foundry Chat - Project: {config.project_name}")
+        print(f"🎯 Using deployment: {config.deployment_name}")
+        print("💡 Features: AI Foundry project inference + Direct API fallback, retry logic, secure authentication")
+        print("Type 'exit' to quit\n")
+        
+        system_msg = {"role": "system", "content": f"You are a helpful AI assistant powered by Azure AI Foundry project '{config.project_name}' using deployment '{config.deployment_name}'. You provide accurate and helpful responses through the AI Foundry inference client."}
+
+        # The rolling tail is a bounded deque: append/pop are O(1) and a
+        # long session can't grow memory without limit. The system prompt
+        # is kept separately so eviction can never drop it.
+        tail = collections.deque(maxlen=24)
+
+        try:
+            _chat_loop(ai_client, system_msg, tail)
+        finally:
+            # Release pooled HTTP connections however the loop exits
+            ai_client.close()
+
+    except Exception as e:
+        logger.error(f"❌ Application startup failed: {e}")
+        print(f"❌ Failed to start application: {e}")
+
+
+def _chat_loop(ai_client, system_msg, tail):
+    """Run the interactive chat loop until the user exits.
+
+    tail is the bounded deque of non-system messages; each request sends
+    [system_msg, *tail] through _trim_messages, so the deque caps what
+    is stored and the trim caps what goes over the wire.
+    """
+    while True:
+        try:
+            # Get user input
+            user_input = input("You: ").strip()
+
+            if user_input.lower() in _EXIT_CMDS:
+                print("👋 Goodbye!")
+                break
+
+            if not user_input:
+                continue
+
+            # Add user message to conversation
+            tail.append({"role": "user", "content": user_input})
+
+            # Generate response using enterprise client, streaming tokens
+            # to the terminal as they arrive: the user sees output at
+            # time-to-first-token instead of after the full generation
+            print("🤔 Thinking...", end="", flush=True)
+            streaming_started = []
+
+            def _print_delta(delta):
+                if not streaming_started:
+                    print(_CLEAR_LINE, end="")  # Clear "Thinking..."
+                    print("Assistant: ", end="")
+                    streaming_started.append(True)
+                print(delta, end="", flush=True)
+
+            response = ai_client.chat_completion(_trim_messages([system_msg, *tail]), on_delta=_print_delta)
+            if not streaming_started:
+                print(_CLEAR_LINE, end="")  # Clear "Thinking..."
+
+            if response:
+                if streaming_started:
+                    print("\n")  # streamed text is already on screen
+                else:
+                    print(f"Assistant: {response}\n")
+                # Add assistant response to conversation
+                tail.append({"role": "assistant", "content": response})
+            else:
+                print("❌ Sorry, I couldn't generate a response. Please try again.\n")
+                # Remove the user message since we couldn't respond
+                tail.pop()
+
+        except KeyboardInterrupt:
+            print("\n👋 Goodbye!")
+            break
+        except Exception as e:
+            logger.error(f"❌ Error in main loop: {e}")
+            print(f"⚠️ An error occurred: {e}. Please try again.\n")
+            # Remove the user message if there was an error
+            if tail and tail[-1]["role"] == "user":
+                tail.pop()
+
+
+if __name__ == '__main__':
+    main()
@@ -1,200 +1,297 @@
-import os
-import json
-from flask import Flask, render_template, request, jsonify, session
-from flask_cors import CORS
-from dotenv import load_dotenv
-from openai import AzureOpenAI
-import uuid
-
-# Load environment variables
-load_dotenv()
-
-app = Flask(__name__)
-app.secret_key = os.urandom(24)
-CORS(app)
-
-# Configuration
-OPEN_AI_ENDPOINT = os.getenv("OPEN_AI_ENDPOINT")
-OPEN_AI_KEY = os.getenv("OPEN_AI_KEY")
-CHAT_MODEL = os.getenv("CHAT_MODEL")
-EMBEDDING_MODEL = os.getenv("EMBEDDING_MODEL")
-SEARCH_URL = os.getenv("SEARCH_ENDPOINT")
-SEARCH_KEY = os.getenv("SEARCH_KEY")
-INDEX_NAME = os.getenv("INDEX_NAME")
-
-# Initialize Azure OpenAI client
-chat_client = AzureOpenAI(
-    api_version="2024-12-01-preview",
-    azure_endpoint=OPEN_AI_ENDPOINT,
-    api_key=OPEN_AI_KEY
-)
-
-def get_chat_session():
-    """Get or create chat session"""
-    if 'chat_id' not in session:
-        session['chat_id'] = str(uuid.uuid4())
-        session['messages'] = [
-            {"role": "system", "content": "You are a friendly travel assistant for Margie's Travel. You help customers find the perfect travel experiences using our comprehensive travel database. Be helpful, enthusiastic, and provide detailed information about destinations, accommodations, and travel services."}
-        ]
-    return session['messages']
-
-def create_rag_params():
-    """Create RAG parameters for Azure AI Search integration"""
-    return {
-        "data_sources": [
-            {
-                "type": "azure_search",
-                "parameters": {
-                    "endpoint": SEARCH_URL,
-                    "index_name": INDEX_NAME,
-                    "authentication": {
-                        "type": "api_key",
-                        "key": SEARCH_KEY,
-                    },
-                    "query_type": "simple",  # Use simple query type for now
-                    "in_scope": True,
-                    "strictness": 3,
-                    "embedding_dependency": {
-                        "type": "deployment_name",
-                        "deployment_name": EMBEDDING_MODEL,
-                    }
-                }
-            }
-        ],
-    }
-
-@app.route('/')
-def index():
-    """Main page"""
-    return render_template('index.html')
-
-@app.route('/api/chat', methods=['POST'])
-def chat():
-    """Handle chat messages"""
-    try:
-        data = request.get_json()
-        user_message = data.get('message', '').strip()
-        
-        if not user_message:
-            return jsonify({'error': 'Message cannot be empty'}), 400
-        
-        print(f"🔍 DEBUG: User message: {user_message}")
-        
-        # Get chat session
-        messages = get_chat_session()
-        
-        # Add user message
-        messages.append({"role": "user", "content": user_message})
-        
-        # Create RAG parameters
-        rag_params = create_rag_params()
-        print(f"🔍 DEBUG: RAG params: {rag_params}")
-        
-        # Get response from Azure OpenAI with RAG
-        response = chat_client.chat.completions.create(
-            model=CHAT_MODEL,
-            messages=messages,
-            extra_body=rag_params,
-            max_tokens=1000,
-            temperature=0.7
-        )
-        
-        assistant_message = response.choices[0].message.content
-        print(f"🔍 DEBUG: Assistant response: {assistant_message}")
-        
-        # Check if there are citations or context sources
-        if hasattr(response.choices[0].message, 'context') and response.choices[0].message.context:
-            print(f"🔍 DEBUG: Context found: {response.choices[0].message.context}")
-        
-        # Add assistant response to conversation history
-        messages.append({"role": "assistant", "content": assistant_message})
-        
-        # Update session
-        session['messages'] = messages
-        
-        return jsonify({
-            'response': assistant_message,
-            'chat_id': session['chat_id']
-        })
-        
-    except Exception as e:
-        print(f"❌ ERROR in chat endpoint: {str(e)}")
-        import traceback
-        traceback.print_exc()
-        return jsonify({'error': f'Sorry, I encountered an error: {str(e)}'}), 500
-
-@app.route('/api/clear', methods=['POST'])
-def clear_chat():
-    """Clear chat history"""
-    try:
-        session.pop('chat_id', None)
-        session.pop('messages', None)
-        return jsonify({'success': True, 'message': 'Chat history cleared'})
-    except Exception as e:
-        return jsonify({'error': str(e)}), 500
-
-@app.route('/api/history', methods=['GET'])
-def get_history():
-    """Get chat history"""
-    try:
-        messages = session.get('messages', [])
-        # Filter out system messages for the UI
-        user_messages = [msg for msg in messages if msg['role'] in ['user', 'assistant']]
-        return jsonify({
-            'messages': user_messages,
-            'chat_id': session.get('chat_id')
-        })
-    except Exception as e:
-        return jsonify({'error': str(e)}), 500
-
-@app.route('/health')
-def health():
-    """Health check endpoint"""
-    return jsonify({'status': 'healthy', 'service': 'Margie\'s Travel RAG App'})
-
-@app.route('/api/test-search', methods=['GET'])
-def test_search():
-    """Test Azure AI Search connectivity"""
-    try:
-        import requests
-        
-        # Test Azure AI Search directly
-        headers = {
-            'Content-Type': 'application/json',
-            'api-key': SEARCH_KEY
-        }
-        
-        # Simple search test
-        search_url = f"{SEARCH_URL}/indexes/{INDEX_NAME}/docs"
-        params = {
-            'api-version': '2021-04-30-Preview',
-            'search': 'Dubai',
-            'top': 3
-        }
-        
-        response = requests.get(search_url, headers=headers, params=params)
-        search_results = response.json()
-        
-        print(f"🔍 SEARCH TEST: Status {response.status_code}")
-        print(f"🔍 SEARCH RESULTS: {search_results}")
-        
-        return jsonify({
-            'status': 'success',
-            'search_endpoint': SEARCH_URL,
-            'index_name': INDEX_NAME,
-            'results_count': search_results.get('value', []),
-            'search_response': search_results
-        })
-        
-    except Exception as e:
-        print(f"❌ SEARCH TEST ERROR: {str(e)}")
-        return jsonify({
-            'status': 'error',
-            'error': str(e),
-            'search_endpoint': SEARCH_URL,
-            'index_name': INDEX_NAME
-        }), 500
-
-if __name__ == '__main__':
-    port = int(os.environ.get('PORT', 8000))
-    app.run(host='0.0.0.0', port=port, debug=False)
+import atexit
+import logging
+import os
+import json
+import ssl
+import threading
+import requests
+import httpx
+from collections import OrderedDict
+from flask import Flask, render_template, request, Response, session
+from flask_cors import CORS
+from dotenv import load_dotenv
+from openai import AzureOpenAI
+import uuid
+
+# orjson (C-accelerated) is used when installed; encoding chat responses
+# and decoding request bodies with it is several times faster than stdlib
+# json, which matters once histories reach multiple KB. Falls back to the
+# stdlib so the app runs without it.
+try:
+    import orjson
+
+    def _json_dumps(obj):
+        return orjson.dumps(obj)
+
+    _json_loads = orjson.loads
+except ImportError:
+    def _json_dumps(obj):
+        return json.dumps(obj).encode('utf-8')
+
+    _json_loads = json.loads
+
+
+def _json_response(obj, status=200):
+    """jsonify replacement backed by the fast serializer"""
+    return Response(_json_dumps(obj), status=status, mimetype='application/json')
+
+# Load environment variables
+load_dotenv()
+
+# Lazy %-style logging: messages below the active level cost a level
+# check, not string formatting of multi-KB histories. Raise to DEBUG via
+# LOG_LEVEL when diagnosing.
+logging.basicConfig(level=os.getenv('LOG_LEVEL', 'INFO').upper())
+logger = logging.getLogger(__name__)
+
+app = Flask(__name__)
+app.secret_key = os.urandom(24)
+CORS(app)
+
+# Configuration
+OPEN_AI_ENDPOINT = os.getenv("OPEN_AI_ENDPOINT")
+OPEN_AI_KEY = os.getenv("OPEN_AI_KEY")
+CHAT_MODEL = os.getenv("CHAT_MODEL")
+EMBEDDING_MODEL = os.getenv("EMBEDDING_MODEL")
+SEARCH_URL = os.getenv("SEARCH_ENDPOINT")
+SEARCH_KEY = os.getenv("SEARCH_KEY")
+INDEX_NAME = os.getenv("INDEX_NAME")
+
+# Shared SSL context and pooled HTTP client for Azure OpenAI. Building the
+# SSL context is the expensive part of client construction (it reads the CA
+# bundle from disk), and the keep-alive pool reuses TLS connections across
+# chat turns instead of re-handshaking per request.
+_shared_ssl = ssl.create_default_context()
+_shared_http = httpx.Client(
+    verify=_shared_ssl,
+    limits=httpx.Limits(max_keepalive_connections=20, max_connections=40),
+    timeout=30.0
+)
+atexit.register(_shared_http.close)
+
+# Initialize Azure OpenAI client
+chat_client = AzureOpenAI(
+    api_version="2024-12-01-preview",
+    azure_endpoint=OPEN_AI_ENDPOINT,
+    api_key=OPEN_AI_KEY,
+    http_client=_shared_http
+)
+
+_SYSTEM_MESSAGE = {"role": "system", "content": "You are a friendly travel assistant for Margie's Travel. You help customers find the perfect travel experiences using our comprehensive travel database. Be helpful, enthusiastic, and provide detailed information about destinations, accommodations, and travel services."}
+
+# Conversation histories live server-side, keyed by the chat_id kept in the
+# cookie session. Shipping the whole messages list through the signed cookie
+# re-serialized it on every request and silently truncates at the ~4 KB
+# cookie cap as history grows. The dict is bounded LRU-style so abandoned
+# chats don't accumulate forever. Because it is per-process, the app must
+# run as a single (threaded) worker — see Procfile; scaling to multiple
+# workers requires swapping in a shared store (e.g. Redis) behind the
+# same interface.
+_HISTORIES = OrderedDict()
+_MAX_HISTORIES = 1000
+# Guards insert/evict under threaded workers; deliberately not held
+# around the OpenAI call, which is the long blocking part of a request
+_HISTORIES_LOCK = threading.Lock()
+
+# Pooled session plus precomputed URL/headers for the search diagnostics
+# endpoint: keep-alive reuses the TLS connection to the search service and
+# nothing request-invariant is rebuilt per call.
+_search_session = requests.Session()
+_search_session.mount('https://', requests.adapters.HTTPAdapter(pool_connections=4, pool_maxsize=20))
+_search_url = f"{SEARCH_URL}/indexes/{INDEX_NAME}/docs"
+_search_headers = {
+    'Content-Type': 'application/json',
+    'api-key': SEARCH_KEY
+}
+
+
+def get_chat_session():
+    """Get or create the conversation history for this browser session"""
+    if 'chat_id' not in session:
+        session['chat_id'] = str(uuid.uuid4())
+
+    chat_id = session['chat_id']
+    with _HISTORIES_LOCK:
+        messages = _HISTORIES.get(chat_id)
+        if messages is None:
+            messages = [dict(_SYSTEM_MESSAGE)]
+            _HISTORIES[chat_id] = messages
+            if len(_HISTORIES) > _MAX_HISTORIES:
+                _HISTORIES.popitem(last=False)  # evict the least recently used chat
+        else:
+            _HISTORIES.move_to_end(chat_id)
+    return messages
+
+def _trim_messages(messages, max_turns=12, max_chars=24000):
+    """Return the system prompt plus a bounded tail of the conversation.
+
+    Keeps tokens-per-request flat instead of growing with every turn; the
+    char budget (~4 chars per token) guards against a few huge messages.
+    """
+    head, tail = messages[:1], messages[1:]
+    if len(tail) > max_turns:
+        tail = tail[-max_turns:]
+
+    budget = 0
+    for index in range(len(tail) - 1, -1, -1):
+        budget += len(tail[index].get("content") or "")
+        if budget > max_chars:
+            # Keep at least the newest message even when it alone busts
+            # the budget: dropping it would send the model a request
+            # without the turn it is supposed to answer
+            tail = tail[index + 1:] or tail[-1:]
+            break
+
+    return head + tail
+
+# RAG parameters for Azure AI Search integration. Everything in here is
+# config-derived and fixed for the process lifetime, so the structure is
+# built once at import rather than per chat request.
+_RAG_PARAMS = {
+    "data_sources": [
+        {
+            "type": "azure_search",
+            "parameters": {
+                "endpoint": SEARCH_URL,
+                "index_name": INDEX_NAME,
+                "authentication": {
+                    "type": "api_key",
+                    "key": SEARCH_KEY,
+                },
+                "query_type": "simple",  # Use simple query type for now
+                "in_scope": True,
+                "strictness": 3,
+                "embedding_dependency": {
+                    "type": "deployment_name",
+                    "deployment_name": EMBEDDING_MODEL,
+                }
+            }
+        }
+    ],
+}
+
+@app.route('/')
+def index():
+    """Main page"""
+    return render_template('index.html')
+
+@app.route('/api/chat', methods=['POST'])
+def chat():
+    """Handle chat messages"""
+    try:
+        data = _json_loads(request.get_data() or b'{}')
+        user_message = data.get('message', '').strip()
+        
+        if not user_message:
+            return _json_response({'error': 'Message cannot be empty'}, 400)
+        
+        logger.debug("User message: %s", user_message)
+        
+        # Get chat session
+        messages = get_chat_session()
+        
+        # Add user message
+        messages.append({"role": "user", "content": user_message})
+        
+        
+        # Get response from Azure OpenAI with RAG
+        response = chat_client.chat.completions.create(
+            model=CHAT_MODEL,
+            messages=_trim_messages(messages),  # full history stays server-side for the UI
+            extra_body=_RAG_PARAMS,
+            max_tokens=1000,
+            temperature=0.7
+        )
+        
+        assistant_message = response.choices[0].message.content
+        logger.debug("Assistant response: %s", assistant_message)
+        
+        # Check if there are citations or context sources
+        if logger.isEnabledFor(logging.DEBUG):
+            if hasattr(response.choices[0].message, 'context') and response.choices[0].message.context:
+                logger.debug("Context found: %s", response.choices[0].message.context)
+        
+        # Add assistant response to conversation history
+        messages.append({"role": "assistant", "content": assistant_message})
+        
+        return _json_response({
+            'response': assistant_message,
+            'chat_id': session['chat_id']
+        })
+        
+    except Exception as e:
+        logger.exception("Error in chat endpoint")
+        return _json_response({'error': f'Sorry, I encountered an error: {str(e)}'}, 500)
+
+@app.route('/api/clear', methods=['POST'])
+def clear_chat():
+    """Clear chat history"""
+    try:
+        chat_id = session.pop('chat_id', None)
+        if chat_id is not None:
+            with _HISTORIES_LOCK:
+                _HISTORIES.pop(chat_id, None)
+        return _json_response({'success': True, 'message': 'Chat history cleared'})
+    except Exception as e:
+        return _json_response({'error': str(e)}, 500)
+
+@app.route('/api/history', methods=['GET'])
+def get_history():
+    """Get chat history"""
+    try:
+        messages = _HISTORIES.get(session.get('chat_id'), [])
+        # Filter out system messages for the UI
+        user_messages = [msg for msg in messages if msg['role'] in ['user', 'assistant']]
+        return _json_response({
+            'messages': user_messages,
+            'chat_id': session.get('chat_id')
+        })
+    except Exception as e:
+        return _json_response({'error': str(e)}, 500)
+
+@app.route('/health')
+def health():
+    """Health check endpoint"""
+    return _json_response({'status': 'healthy', 'service': 'Margie\'s Travel RAG App'})
+
+@app.route('/api/test-search', methods=['GET'])
+def test_search():
+    """Test Azure AI Search connectivity"""
+    try:
+        # Simple search test against the shared pooled session
+        params = {
+            'api-version': '2021-04-30-Preview',
+            'search': 'Dubai',
+            'top': 3
+        }
+        
+        response = _search_session.get(_search_url, headers=_search_headers, params=params, timeout=10)
+        search_results = response.json()
+        
+        logger.debug("Search test status: %s", response.status_code)
+        logger.debug("Search results: %s", search_results)
+        
+        return _json_response({
+            'status': 'success',
+            'search_endpoint': SEARCH_URL,
+            'index_name': INDEX_NAME,
+            'results_count': search_results.get('value', []),
+            'search_response': search_results
+        })
+        
+    except Exception as e:
+        logger.exception("Search test failed")
+        return _json_response({
+            'status': 'error',
+            'error': str(e),
+            'search_endpoint': SEARCH_URL,
+            'index_name': INDEX_NAME
+        }, 500)
+
+if __name__ == '__main__':
+    # Dev entrypoint only; threaded so a slow completion doesn't serialize
+    # every other request. Production serving goes through gunicorn with
+    # threaded workers (see Procfile), which lets in-flight LLM calls
+    # overlap across workers x threads.
+    port = int(os.environ.get('PORT', 8000))
+    app.run(host='0.0.0.0', port=port, debug=False, threaded=True)